@@ -6,15 +6,22 @@ It initializes Flask, configures middleware, registers blueprints,
 and sets up Swagger documentation.
 """
 
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, jsonify, send_from_directory, request, make_response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_restx import Api
+from flask_restx.representations import output_json as restx_output_json
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from pymongo import MongoClient
 from config import get_config
+import json
 import logging
 import os
+import threading
+import traceback
 import certifi
+import orjson
+from cachetools import TTLCache
 from datetime import datetime
 
 # Configure logging - level will be set in create_app() after config is loaded
@@ -24,6 +31,131 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    Parse request bodies with orjson.
+
+    request.get_json() goes through app.json.loads for every POST/PUT.
+    orjson is stricter than the stdlib parser (no NaN/Infinity, no
+    integers wider than 64 bits), so bodies it rejects are retried with
+    the stdlib parser; malformed bodies still raise ValueError there and
+    become a 400 from Flask.
+    """
+
+    def loads(self, s, **kwargs):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            return super().loads(s, **kwargs)
+
+
+class OrjsonSocketIOJSON:
+    """
+    json module stand-in for Socket.IO/Engine.IO packets.
+
+    Every emitted event (new messages, reactions, ...) is serialized once
+    per packet, so this sits on the real-time hot path. The packet layer
+    passes json.dumps options such as separators; they are ignored because
+    orjson output is already compact.
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
+# How long an /api/health result is reused before MongoDB is checked again
+HEALTH_CHECK_TTL_SECONDS = 5
+
+
+def _load_build_info():
+    """Read build-info.json, falling back to environment variables."""
+    try:
+        build_info_path = os.path.join(os.path.dirname(__file__), '..', 'build-info.json')
+        if os.path.exists(build_info_path):
+            with open(build_info_path, 'r') as f:
+                return json.load(f)
+        return {}
+    except Exception:
+        # Fallback to environment variables or defaults
+        return {
+            'version': '1.0.0',
+            'gitCommit': os.environ.get('GIT_COMMIT', 'unknown'),
+            'gitShort': os.environ.get('GIT_COMMIT_SHORT', os.environ.get('GIT_COMMIT', 'unknown')[:7] if os.environ.get('GIT_COMMIT') else 'unknown'),
+            'gitBranch': os.environ.get('GIT_BRANCH', 'unknown'),
+            'buildTime': 'unknown'
+        }
+
+
+def _run_health_check(app, build_info):
+    """
+    Check the MongoDB connection and build the /api/health response.
+
+    Args:
+        app: Flask application
+        build_info: Parsed build-info.json contents
+
+    Returns:
+        tuple: (response payload dict, HTTP status code)
+    """
+    health_status = {
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat(),
+        'version': build_info.get('version', '1.0.0'),
+        'commit': build_info.get('gitCommit', 'unknown'),
+        'commitShort': build_info.get('gitShort', 'unknown'),
+        'branch': build_info.get('gitBranch', 'unknown'),
+        'buildTime': build_info.get('buildTime', 'unknown'),
+        'flask_env': app.config.get('FLASK_ENV', 'unknown'),
+        'debug': app.config.get('DEBUG', 'unknown')
+    }
+
+    try:
+        # Check MongoDB connection with the cheapest round-trip it offers
+        start_time = datetime.utcnow()
+        app.mongo_client.admin.command('ping')
+        connection_time = (datetime.utcnow() - start_time).total_seconds()
+
+        health_status.update({
+            'database': 'connected',
+            'mongodb_version': getattr(app, 'mongodb_version', 'unknown'),
+            'connection_time_seconds': round(connection_time, 3),
+            'database_name': app.config.get('MONGODB_DB_NAME', 'chatapp'),
+            'mongodb_uri_type': 'atlas' if 'mongodb+srv://' in app.config.get('MONGODB_URI', '') else 'standard'
+        })
+
+        return {
+            'message': 'Chat API is running',
+            **health_status
+        }, 200
+
+    except Exception as e:
+        error_details = {
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'traceback': traceback.format_exc()
+        }
+
+        health_status.update({
+            'status': 'unhealthy',
+            'database': 'disconnected',
+            'mongodb_uri_configured': bool(app.config.get('MONGODB_URI')),
+            'mongodb_uri_type': 'atlas' if 'mongodb+srv://' in app.config.get('MONGODB_URI', '') else 'standard',
+            'error_details': error_details
+        })
+
+        logger.error(f"Health check failed: {error_details}")
+
+        return {
+            'message': 'Chat API is running but database is unavailable',
+            **health_status
+        }, 503
+
+
 def create_app():
     """
     Application factory pattern.
@@ -35,6 +167,7 @@ def create_app():
     
     # Initialize Flask app
     app = Flask(__name__)
+    app.json = OrjsonJSONProvider(app)
     
     # Load configuration
     config = get_config()
@@ -53,13 +186,14 @@ def create_app():
             "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "X-User-ID", "X-User-Email", "X-User-Role"],
             "expose_headers": ["Content-Type", "Authorization"],
             "supports_credentials": True,
-            "max_age": 3600  # Cache preflight requests for 1 hour
+            "max_age": 86400  # Cache preflight requests for 24 hours (browsers may cap it lower)
         },
         r"/socket.io/*": {
             "origins": app.config['CORS_ORIGINS'],
             "methods": ["GET", "POST", "OPTIONS"],
             "allow_headers": ["Content-Type", "Authorization", "X-User-ID", "X-User-Email", "X-User-Role"],
-            "supports_credentials": True
+            "supports_credentials": True,
+            "max_age": 86400  # Cache preflight requests for 24 hours
         },
         r"/static/*": {
             "origins": "*",  # Allow static files from anywhere
@@ -72,9 +206,19 @@ def create_app():
     socketio = SocketIO(
         app, 
         cors_allowed_origins=app.config['CORS_ORIGINS'],
+        # Pinned: gunicorn runs -k eventlet, and the metrics GreenPool and the
+        # eventlet.tpool offloads (bcrypt, QR codes) only work under eventlet
         async_mode='eventlet',
-        logger=True,
-        engineio_logger=True
+        json=OrjsonSocketIOJSON,
+        # Formatting a log line for every packet costs more than sending it;
+        # set SOCKETIO_LOGGER=true to trace traffic while debugging
+        logger=app.config['SOCKETIO_LOGGER'],
+        engineio_logger=app.config['SOCKETIO_LOGGER'],
+        ping_interval=25,
+        ping_timeout=60,
+        # With a queue, emits are published through Redis so every worker
+        # delivers them to its own clients; clients still need sticky sessions
+        message_queue=app.config['SOCKETIO_REDIS_URL']
     )
     app.socketio = socketio
     
@@ -89,16 +233,17 @@ def create_app():
             'serverSelectionTimeoutMS': 5000,  # Reduced timeout for faster failures
             'connectTimeoutMS': 5000,  # Faster connection timeout
             'socketTimeoutMS': 10000,  # Reduced socket timeout
-            'maxPoolSize': 5,  # Increased pool size for 2 workers
-            'minPoolSize': 2,  # Keep minimum connections warm
-            'maxIdleTimeMS': 60000,  # Keep connections longer to avoid reconnection overhead
+            'maxPoolSize': app.config['MONGO_MAX_POOL'],  # Sized for the green threads of one eventlet worker
+            'minPoolSize': app.config['MONGO_MIN_POOL'],  # Keep minimum connections warm
+            'maxIdleTimeMS': 300000,  # Keep connections longer to avoid reconnection overhead
             'retryWrites': True,  # Enable retry writes
             'w': 'majority',  # Write concern
             'heartbeatFrequencyMS': 30000,  # More frequent heartbeats for faster detection
             'directConnection': False,  # Allow connection to replica sets
-            'waitQueueTimeoutMS': 3000,  # Shorter queue timeout to fail fast
+            'waitQueueTimeoutMS': 5000,  # Fail a request that waits this long for a pooled connection
             'maxConnecting': 2,  # Limit concurrent connection attempts
             'compressors': [],  # Disable compression to reduce overhead
+            'appname': 'chatapp',  # Identifies this app's connections in server logs and currentOp
         }
 
         mongodb_uri = app.config.get('MONGODB_URI')
@@ -132,8 +277,7 @@ def create_app():
         for attempt in range(max_retries):
             try:
                 logger.info(f"Testing MongoDB connection (attempt {attempt + 1}/{max_retries})")
-                server_info = app.mongo_client.server_info()
-                logger.info(f"MongoDB server version: {server_info.get('version', 'unknown')}")
+                app.mongo_client.admin.command('ping')
                 connection_successful = True
                 break
             except Exception as e:
@@ -143,13 +287,21 @@ def create_app():
                     logger.error("MongoDB URI configured: " + str(bool(app.config.get('MONGODB_URI'))))
                     logger.error("URI type: " + ('MongoDB Atlas (mongodb+srv)' if 'mongodb+srv://' in mongodb_uri else 'Standard'))
                     # Don't raise - let the app start and retry connections later
-                else:
-                    import time
-                    time.sleep(1)
+                # No pause between attempts: ping already waits up to
+                # serverSelectionTimeoutMS for a reachable server, so an extra
+                # sleep would only add startup latency
 
         if connection_successful:
             app.db = app.mongo_client[app.config['MONGODB_DB_NAME']]
 
+            # The server version is only reported, never re-checked, so the
+            # (comparatively large) buildInfo reply is fetched once here
+            try:
+                app.mongodb_version = app.mongo_client.server_info().get('version', 'unknown')
+                logger.info(f"MongoDB server version: {app.mongodb_version}")
+            except Exception as e:
+                logger.warning(f"Could not read MongoDB server version: {str(e)}")
+
             # Test database access
             try:
                 collections = app.db.list_collection_names()
@@ -164,6 +316,17 @@ def create_app():
                     logger.warning("No collections found in database")
             except Exception as e:
                 logger.error(f"Failed to access database collections: {str(e)}")
+
+            # Ensure model indexes now so the first chat requests after a
+            # deploy don't each pay a batch of create_index round-trips
+            try:
+                from models.message import Message
+                from models.user_channel_read import UserChannelRead
+                Message(app.db)
+                UserChannelRead(app.db)
+                logger.info("✅ Model indexes ensured at startup")
+            except Exception as e:
+                logger.warning(f"Index warm-up failed, models will retry on first use: {str(e)}")
         else:
             logger.warning("⚠️ Starting Flask app without MongoDB connection. Database operations will fail until connection is established.")
             # Set a dummy database reference to prevent attribute errors
@@ -187,13 +350,13 @@ def create_app():
     @app.before_request
     def log_request_info():
         if config.LOG_LEVEL == 'DEBUG':
-            logger.debug(f"📥 HTTP Request: {request.method} {request.path} from {request.remote_addr}")
+            logger.debug("📥 HTTP Request: %s %s from %s", request.method, request.path, request.remote_addr)
             if request.method in ['POST', 'PUT', 'PATCH'] and request.content_type == 'application/json':
                 try:
                     # Log request body for debugging (be careful with sensitive data)
                     body = request.get_json()
                     if body and 'password' not in str(body).lower():  # Don't log passwords
-                        logger.debug(f"📥 Request body: {body}")
+                        logger.debug("📥 Request body: %s", body)
                 except Exception:
                     pass  # Ignore JSON parsing errors
 
@@ -208,21 +371,24 @@ def create_app():
             )
         )
 
-        if should_log_health:
+        # Runs on every request: skip building the line when INFO is off, and
+        # let the logger format it lazily otherwise
+        if should_log_health and logger.isEnabledFor(logging.INFO):
             # Always log response status for observability
             status_emoji = "✅" if response.status_code < 300 else "⚠️" if response.status_code < 500 else "❌"
-            logger.info(f"📤 HTTP Response: {request.method} {request.path} -> {response.status_code} {status_emoji}")
+            logger.info("📤 HTTP Response: %s %s -> %s %s",
+                        request.method, request.path, response.status_code, status_emoji)
 
         # Log more details in debug mode
         if config.LOG_LEVEL == 'DEBUG':
-            logger.debug(f"📤 Response headers: {dict(response.headers)}")
+            logger.debug("📤 Response headers: %s", dict(response.headers))
             if response.content_type == 'application/json' and hasattr(response, 'data'):
                 try:
                     # Log response body in debug mode (truncate if too long)
                     data_str = response.get_data(as_text=True)
                     if len(data_str) > 500:
                         data_str = data_str[:500] + "... (truncated)"
-                    logger.debug(f"📤 Response body: {data_str}")
+                    logger.debug("📤 Response body: %s", data_str)
                 except Exception:
                     pass  # Ignore errors
 
@@ -247,6 +413,20 @@ def create_app():
         },
         security='Bearer'
     )
+
+    # Serialize API responses with orjson instead of the stdlib json module
+    # Flask-RESTX uses by default - every resource's dict goes through here.
+    # Output matches Flask-RESTX's (compact, newline-terminated); when
+    # RESTX_JSON options are configured, or in debug mode where it
+    # pretty-prints, Flask-RESTX's own serializer is used instead.
+    @api.representation('application/json')
+    def output_json(data, code, headers=None):
+        if app.debug or app.config.get('RESTX_JSON'):
+            return restx_output_json(data, code, headers)
+        response = make_response(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS) + b"\n", code)
+        response.headers.extend(headers or {})
+        response.headers['Content-Type'] = 'application/json'
+        return response
     
     # Flask-RESTX error handlers for API endpoints
     # These ensure consistent JSON error responses across all API routes
@@ -262,8 +442,7 @@ def create_app():
         logger.error(f"Request: {request.method} {request.path}")
         logger.error("This usually means an endpoint returned a non-JSON-serializable value.")
         logger.error("Check that all endpoints return dict/list/str with status code tuple.")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Traceback:", exc_info=True)
         
         return {
             'error': 'Internal server error',
@@ -314,13 +493,13 @@ def create_app():
     @socketio.on('connect')
     def handle_connect():
         """Handle client connection"""
-        logger.info(f'Client connected: {request.sid}')
+        logger.info('Client connected: %s', request.sid)
         emit('connected', {'message': 'Connected to server'})
     
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle client disconnection"""
-        logger.info(f'Client disconnected: {request.sid}')
+        logger.info('Client disconnected: %s', request.sid)
     
     @socketio.on('join_channel')
     def handle_join_channel(data):
@@ -328,7 +507,7 @@ def create_app():
         channel_id = data.get('channelId')
         if channel_id:
             join_room(channel_id)
-            logger.info(f'Client {request.sid} joined channel {channel_id}')
+            logger.info('Client %s joined channel %s', request.sid, channel_id)
             emit('joined_channel', {'channelId': channel_id}, room=request.sid)
     
     @socketio.on('leave_channel')
@@ -337,115 +516,63 @@ def create_app():
         channel_id = data.get('channelId')
         if channel_id:
             leave_room(channel_id)
-            logger.info(f'Client {request.sid} left channel {channel_id}')
+            logger.info('Client %s left channel %s', request.sid, channel_id)
 
     # NOTE: Google OAuth is now handled by NextAuth.js on the frontend
     # The Flask backend routes/google_oauth.py is DEPRECATED and NOT registered
     # NextAuth configuration is in: lib/auth.ts
     # OAuth user creation/linking is automatic via NextAuth callbacks
 
+    # Build info only changes with a deploy, so it is read once here rather
+    # than from disk on every health probe
+    build_info = _load_build_info()
+
+    # Last /api/health result as (payload, status code). Probes arriving
+    # within the TTL reuse it instead of querying MongoDB again; 'last'
+    # outlives the TTL so probes can be answered while a refresh runs.
+    app.health_cache = TTLCache(maxsize=1, ttl=HEALTH_CHECK_TTL_SECONDS)
+    app.health_state = {'refreshing': False, 'last': None}
+    # Only guards the flag flip below and is never held across I/O. With
+    # gunicorn --preload this runs before eventlet patches threading, so a
+    # native lock held across the ping would stall the whole worker.
+    health_lock = threading.Lock()
+
     # Health check endpoint
     @app.route('/api/health', methods=['GET'])
     def health_check():
         """
         Health check endpoint to verify API is running
 
+        LEARNING NOTE:
+        - Load balancer and container probes call this every few seconds
+          per replica; the result is cached for HEALTH_CHECK_TTL_SECONDS so
+          they are answered from memory between MongoDB checks
+        - When it expires one request refreshes it; probes arriving during
+          the refresh get the previous result instead of pinging too
+
         Returns:
             JSON response with status
         """
-        # Load build info if available
-        build_info = {}
-        try:
-            import os
-            import json
-            build_info_path = os.path.join(os.path.dirname(__file__), '..', 'build-info.json')
-            if os.path.exists(build_info_path):
-                with open(build_info_path, 'r') as f:
-                    build_info = json.load(f)
-        except Exception:
-            # Fallback to environment variables or defaults
-            build_info = {
-                'version': '1.0.0',
-                'gitCommit': os.environ.get('GIT_COMMIT', 'unknown'),
-                'gitShort': os.environ.get('GIT_COMMIT_SHORT', os.environ.get('GIT_COMMIT', 'unknown')[:7] if os.environ.get('GIT_COMMIT') else 'unknown'),
-                'gitBranch': os.environ.get('GIT_BRANCH', 'unknown'),
-                'buildTime': 'unknown'
-            }
-
-        health_status = {
-            'status': 'healthy',
-            'timestamp': datetime.utcnow().isoformat(),
-            'version': build_info.get('version', '1.0.0'),
-            'commit': build_info.get('gitCommit', 'unknown'),
-            'commitShort': build_info.get('gitShort', 'unknown'),
-            'branch': build_info.get('gitBranch', 'unknown'),
-            'buildTime': build_info.get('buildTime', 'unknown'),
-            'flask_env': app.config.get('FLASK_ENV', 'unknown'),
-            'debug': app.config.get('DEBUG', 'unknown')
-        }
-
-        try:
-            # Check MongoDB connection with detailed diagnostics
-            start_time = datetime.utcnow()
-            server_info = app.mongo_client.server_info()
-            connection_time = (datetime.utcnow() - start_time).total_seconds()
-
-            # Test database access and actual operations (like auth routes use)
-            db_name = app.config.get('MONGODB_DB_NAME', 'chatapp')
-
-            # Test actual database operations that auth routes use
-            try:
-                # Test collections access
-                collections = app.db.list_collection_names()
-
-                # Test user collection operations (what registration/login use)
-                user_collection = app.db['users']
-                user_collection.find_one({'_test': 'health_check'})  # Non-existent test query
-
-                db_operations_working = True
-            except Exception as db_op_error:
-                logger.error(f"Database operations test failed: {str(db_op_error)}")
-                db_operations_working = False
-                raise db_op_error
-
-            health_status.update({
-                'database': 'connected',
-                'database_operations': 'working' if db_operations_working else 'failed',
-                'mongodb_version': server_info.get('version', 'unknown'),
-                'connection_time_seconds': round(connection_time, 3),
-                'database_name': db_name,
-                'collections_count': len(collections) if db_operations_working else 0,
-                'mongodb_uri_type': 'atlas' if 'mongodb+srv://' in app.config.get('MONGODB_URI', '') else 'standard'
-            })
-
-            return jsonify({
-                'message': 'Chat API is running',
-                **health_status
-            }), 200
-
-        except Exception as e:
-            import traceback
-            error_details = {
-                'error': str(e),
-                'error_type': type(e).__name__,
-                'traceback': traceback.format_exc()
-            }
-
-            health_status.update({
-                'status': 'unhealthy',
-                'database': 'disconnected',
-                'mongodb_uri_configured': bool(app.config.get('MONGODB_URI')),
-                'mongodb_uri_type': 'atlas' if 'mongodb+srv://' in app.config.get('MONGODB_URI', '') else 'standard',
-                'error_details': error_details
-            })
+        result = app.health_cache.get('result')
+        if result is None:
+            state = app.health_state
+            with health_lock:
+                refresh = not state['refreshing'] or state['last'] is None
+                state['refreshing'] = True
+            if refresh:
+                try:
+                    result = _run_health_check(app, build_info)
+                    app.health_cache['result'] = result
+                    state['last'] = result
+                finally:
+                    with health_lock:
+                        state['refreshing'] = False
+            else:
+                result = state['last']
 
-            logger.error(f"Health check failed: {error_details}")
+        payload, status_code = result
+        return jsonify(payload), status_code
 
-            return jsonify({
-                'message': 'Chat API is running but database is unavailable',
-                **health_status
-            }), 503
-    
     # Root endpoint
     @app.route('/')
     def index():
@@ -32,6 +32,10 @@ class Config:
     # MongoDB Configuration
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/chatapp')
     MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'chatapp')
+    # Connection pool bounds per worker process. One eventlet worker serves
+    # many concurrent requests, so the pool must not be the bottleneck.
+    MONGO_MAX_POOL = int(os.getenv('MONGO_MAX_POOL', 100))
+    MONGO_MIN_POOL = int(os.getenv('MONGO_MIN_POOL', 10))
 
     # JWT (JSON Web Token) Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
@@ -62,6 +66,13 @@ class Config:
     # Redis Configuration (Optional - for caching)
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
+    # Socket.IO Configuration
+    # Per-packet Socket.IO/Engine.IO logging is for debugging only
+    SOCKETIO_LOGGER = os.getenv('SOCKETIO_LOGGER', 'False').lower() == 'true'
+    # Redis URL shared by every Socket.IO server so room emits reach clients
+    # connected to other workers/containers. Unset = single process only.
+    SOCKETIO_REDIS_URL = os.getenv('SOCKETIO_REDIS_URL') or None
+
     # Email Configuration (Optional)
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
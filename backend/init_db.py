@@ -65,7 +65,7 @@ def init_database():
             unique=True
         )
         channel_members.create_index([('channel_id', ASCENDING)])
-        channel_members.create_index([('user_id', ASCENDING)])
+        channel_members.create_index([('user_id', ASCENDING), ('channel_id', ASCENDING)])
         print("✅ Channel members collection configured")
         
         # 4. Messages Collection
@@ -108,6 +108,8 @@ def init_database():
         print("1. MongoDB is running")
         print("2. Connection string in .env is correct")
         print("3. You have proper permissions")
+        print("4. channel_members has no duplicate (channel_id, user_id) rows -")
+        print("   scripts/migrate_schema.py removes them before building the unique index")
         sys.exit(1)
     
     finally:
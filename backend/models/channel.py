@@ -10,9 +10,20 @@ LEARNING NOTE:
 - Tracks members and their roles (admin/member)
 """
 
+import logging
 from datetime import datetime
+from bson.errors import InvalidId
 from bson.objectid import ObjectId
 from typing import Optional, Dict, Any, List
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# Process-wide cache of channel id/name -> {'id', 'name'}.
+# Channel names change rarely, so a 5 minute TTL is safe and saves a
+# round-trip on hot paths like DM resolution (polled by the frontend).
+_resolve_cache = TTLCache(maxsize=1024, ttl=300)
 
 
 class Channel:
@@ -60,7 +71,8 @@ class Channel:
     
     def create(self, name: str, created_by: str, 
                description: Optional[str] = None, 
-               channel_type: str = 'public') -> Dict[str, Any]:
+               channel_type: str = 'public',
+               member_ids: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Create a new channel.
         
@@ -75,12 +87,13 @@ class Channel:
             created_by: User ID of creator
             description: Optional channel description
             channel_type: 'public' or 'private'
+            member_ids: Optional extra user IDs to add as regular members
         
         Returns:
             dict: Created channel document
         
         Raises:
-            ValueError: If validation fails
+            ValueError: If validation fails or a member ID is malformed
         """
         
         # Validate channel type
@@ -94,26 +107,63 @@ class Channel:
         if self.find_by_name(channel_name):
             raise ValueError('Channel with this name already exists')
         
-        # Create channel document
+        # Convert every member ID before writing anything, so a malformed
+        # one can't leave behind a channel with no members (and take its name)
+        creator_oid = ObjectId(created_by)
+        try:
+            member_oids = [
+                ObjectId(member_id)
+                for member_id in dict.fromkeys(member_ids or [])
+                if member_id != created_by
+            ]
+        except (InvalidId, TypeError):
+            raise ValueError('Invalid member ID')
+        
+        # Create channel document. One timestamp is shared by the channel
+        # and its initial memberships; the _id is assigned up front so the
+        # membership rows can be built before the channel is inserted.
+        now = datetime.utcnow()
+        channel_id = ObjectId()
         channel_doc = {
+            '_id': channel_id,
             'name': channel_name,
             'description': description,
             'type': channel_type,
-            'created_by': ObjectId(created_by),
+            'created_by': creator_oid,
             'is_deleted': False,
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
+            'created_at': now,
+            'updated_at': now
         }
         
-        # Insert channel
-        result = self.collection.insert_one(channel_doc)
-        channel_id = result.inserted_id
-        
-        # Add creator as admin member
-        self.add_member(str(channel_id), created_by, role='admin')
+        # Creator as admin plus any initial members, added in one insert.
+        # The channel is brand new, so there are no existing members to check.
+        members = [{
+            'channel_id': channel_id,
+            'user_id': creator_oid,
+            'role': 'admin',
+            'joined_at': now,
+            'last_read_at': now
+        }]
+        members.extend(
+            {
+                'channel_id': channel_id,
+                'user_id': member_oid,
+                'role': 'member',
+                'joined_at': now,
+                'last_read_at': now
+            }
+            for member_oid in member_oids
+        )
+        
+        self.collection.insert_one(channel_doc)
+        try:
+            self.members_collection.insert_many(members)
+        except Exception:
+            # Don't leave a memberless channel holding the name
+            self.collection.delete_one({'_id': channel_id})
+            raise
         
         # Return formatted channel
-        channel_doc['_id'] = channel_id
         return self._format_channel(channel_doc)
     
     def find_by_id(self, channel_id: str) -> Optional[Dict[str, Any]]:
@@ -151,6 +201,54 @@ class Channel:
         })
         return self._format_channel(channel) if channel else None
     
+    def resolve_channel(self, id_or_name: str) -> Optional[Dict[str, str]]:
+        """
+        Resolve a channel ID or name to its ID and name in one query.
+        
+        LEARNING NOTE:
+        - Replaces the "find by name, then find again for details" pattern
+        - Projection returns only _id and name instead of the whole document
+        - Results are kept in a small TTL cache; misses are never cached so a
+          freshly created channel resolves immediately
+        - Returns a copy so callers can't mutate the cached entry
+        
+        Args:
+            id_or_name: Channel ObjectId as string, or channel name
+        
+        Returns:
+            dict: {'id': str, 'name': str} or None if not found
+        """
+        key = id_or_name.lower().strip()
+        cached = _resolve_cache.get(key)
+        if cached:
+            return dict(cached)
+        
+        conditions = [{'name': key}]
+        if ObjectId.is_valid(id_or_name):
+            conditions.append({'_id': ObjectId(id_or_name)})
+        
+        try:
+            channel = self.collection.find_one(
+                {'$or': conditions, 'is_deleted': False},
+                {'_id': 1, 'name': 1}
+            )
+        except Exception:
+            return None
+        
+        if not channel:
+            return None
+        
+        resolved = {'id': str(channel['_id']), 'name': channel['name']}
+        _resolve_cache[resolved['id']] = resolved
+        _resolve_cache[resolved['name']] = resolved
+        return dict(resolved)
+    
+    def _invalidate_resolved(self, channel_id: str) -> None:
+        """Drop a channel from the resolve cache after it changes."""
+        resolved = _resolve_cache.pop(channel_id, None)
+        if resolved:
+            _resolve_cache.pop(resolved['name'], None)
+    
     def list_user_channels(self, user_id: str, skip: int = 0, 
                           limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -227,7 +325,7 @@ class Channel:
             channels = list(self.members_collection.aggregate(pipeline))
             return [self._format_channel(ch) for ch in channels]
         except Exception as e:
-            print(f"Error listing channels: {e}")
+            logger.error("Error listing channels: %s", e)
             return []
     
     def list_public_channels(self, skip: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
@@ -253,6 +351,14 @@ class Channel:
         """
         Add a user as a member of a channel.
         
+        LEARNING NOTE:
+        - One upsert with $setOnInsert both checks and inserts, instead of
+          a find_one round-trip followed by insert_one
+        - An existing membership is left untouched (nothing is upserted)
+        - Concurrent joins can't create duplicates: the unique
+          (channel_id, user_id) index (init_db.py, or
+          scripts/migrate_schema.py on existing data) rejects the loser
+        
         Args:
             channel_id: Channel ID
             user_id: User ID to add
@@ -265,27 +371,85 @@ class Channel:
             raise ValueError(f'Invalid role. Must be one of: {self.MEMBER_ROLES}')
         
         try:
-            # Check if member already exists
-            existing = self.members_collection.find_one({
-                'channel_id': ObjectId(channel_id),
-                'user_id': ObjectId(user_id)
-            })
+            now = datetime.utcnow()
+            result = self.members_collection.update_one(
+                {
+                    'channel_id': ObjectId(channel_id),
+                    'user_id': ObjectId(user_id)
+                },
+                {'$setOnInsert': {
+                    'role': role,
+                    'joined_at': now,
+                    'last_read_at': now
+                }},
+                upsert=True
+            )
             
-            if existing:
+            if result.upserted_id is None:
                 return False  # Already a member
             
-            # Add member
-            self.members_collection.insert_one({
-                'channel_id': ObjectId(channel_id),
-                'user_id': ObjectId(user_id),
-                'role': role,
-                'joined_at': datetime.utcnow(),
-                'last_read_at': datetime.utcnow()
-            })
             return True
         except Exception:
             return False
     
+    def add_members(self, channel_id: str, user_ids: List[str],
+                    role: str = 'member') -> List[str]:
+        """
+        Add several users to a channel in one round-trip.
+        
+        LEARNING NOTE:
+        - One $in query finds who is already a member
+        - One insert_many adds everyone else
+        - Replaces calling add_member (2 queries) once per user
+        
+        Args:
+            channel_id: Channel ID
+            user_ids: User IDs to add (duplicates are ignored)
+            role: Member role ('admin' or 'member')
+        
+        Returns:
+            list: User IDs that were actually added
+        
+        Raises:
+            ValueError: If the role or an ID is invalid
+        """
+        if role not in self.MEMBER_ROLES:
+            raise ValueError(f'Invalid role. Must be one of: {self.MEMBER_ROLES}')
+        
+        try:
+            channel_oid = ObjectId(channel_id)
+            user_oids = [ObjectId(uid) for uid in dict.fromkeys(user_ids)]
+        except (InvalidId, TypeError):
+            raise ValueError('Invalid channel or user ID')
+        
+        # Database errors propagate: "nobody was added" must not hide a failure
+        try:
+            existing = {
+                doc['user_id'] for doc in self.members_collection.find(
+                    {'channel_id': channel_oid, 'user_id': {'$in': user_oids}},
+                    {'user_id': 1, '_id': 0}
+                )
+            }
+            
+            now = datetime.utcnow()
+            new_members = [
+                {
+                    'channel_id': channel_oid,
+                    'user_id': user_oid,
+                    'role': role,
+                    'joined_at': now,
+                    'last_read_at': now
+                }
+                for user_oid in user_oids if user_oid not in existing
+            ]
+            
+            if new_members:
+                self.members_collection.insert_many(new_members, ordered=False)
+            return [str(member['user_id']) for member in new_members]
+        except Exception as e:
+            logger.error("Error adding members to channel %s: %s", channel_id, e)
+            raise
+    
     def remove_member(self, channel_id: str, user_id: str) -> bool:
         """
         Remove a user from a channel.
@@ -306,10 +470,36 @@ class Channel:
         except Exception:
             return False
     
+    def get_user_memberships(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the channels a user belongs to and their role in each.
+        
+        LEARNING NOTE:
+        - Not cached: other workers couldn't see a write's eviction, so a
+          removed member would keep seeing the channel until the TTL ran out
+        - Projects only channel_id and role, served by the
+          (user_id, channel_id) index
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            list: [{'channel_id': ObjectId, 'role': str}, ...]
+        """
+        return list(self.members_collection.find(
+            {'user_id': ObjectId(user_id)},
+            {'channel_id': 1, 'role': 1, '_id': 0}
+        ))
+    
     def is_member(self, channel_id: str, user_id: str) -> bool:
         """
         Check if user is a member of channel.
         
+        LEARNING NOTE:
+        - This is an authorization check, so it always reads the database:
+          a cached "yes" would outlive remove_member on other workers
+        - Served by the unique (channel_id, user_id) index, returning only _id
+        
         Args:
             channel_id: Channel ID
             user_id: User ID
@@ -321,7 +511,7 @@ class Channel:
             member = self.members_collection.find_one({
                 'channel_id': ObjectId(channel_id),
                 'user_id': ObjectId(user_id)
-            })
+            }, {'_id': 1})
             return member is not None
         except Exception:
             return False
@@ -342,7 +532,7 @@ class Channel:
                 'channel_id': ObjectId(channel_id),
                 'user_id': ObjectId(user_id),
                 'role': 'admin'
-            })
+            }, {'_id': 1})
             return member is not None
         except Exception:
             return False
@@ -422,6 +612,7 @@ class Channel:
                 {'$set': updates},
                 return_document=True
             )
+            self._invalidate_resolved(channel_id)
             return self._format_channel(result) if result else None
         except Exception:
             return None
@@ -441,6 +632,7 @@ class Channel:
                 {'_id': ObjectId(channel_id)},
                 {'$set': {'is_deleted': True, 'updated_at': datetime.utcnow()}}
             )
+            self._invalidate_resolved(channel_id)
             return result.modified_count > 0
         except Exception:
             return False
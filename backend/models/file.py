@@ -32,6 +32,8 @@ class File:
     
     COLLECTION = 'files'
     
+    _indexes_created = False
+    
     # Valid file statuses
     STATUSES = ['uploading', 'ready', 'deleted']
     
@@ -51,7 +53,9 @@ class File:
     def __init__(self, db):
         """Initialize File model with database connection."""
         self.collection = db[self.COLLECTION]
-        self._create_indexes()
+        if not File._indexes_created:
+            self._create_indexes()
+            File._indexes_created = True
     
     def _create_indexes(self):
         """Create indexes for efficient queries."""
@@ -10,11 +10,16 @@ LEARNING NOTE:
 - Tracks edits, deletions, and reactions
 """
 
+import logging
+import re
 from datetime import datetime
 from bson.objectid import ObjectId
 from typing import Optional, Dict, Any, List
 from models.reaction import Reaction
 from models.thread import Thread
+from models.user import User
+
+logger = logging.getLogger(__name__)
 
 
 class Message:
@@ -81,7 +86,9 @@ class Message:
             dict: Created message document
         """
         
-        # Create message document
+        # Create message document (one timestamp for created/updated, so a
+        # new message never looks 'updated' microseconds after creation)
+        now = datetime.utcnow()
         message_doc = {
             'channel_id': ObjectId(channel_id),
             'user_id': ObjectId(user_id),
@@ -96,8 +103,8 @@ class Message:
                 'mentions': [],  # List of mentioned user IDs
                 'link_preview': None
             },
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
+            'created_at': now,
+            'updated_at': now
         }
         
         # Insert message
@@ -109,7 +116,7 @@ class Message:
             try:
                 self.thread_model.add_reply(parent_message_id, str(result.inserted_id))
             except Exception as e:
-                print(f"Warning: Failed to add thread relationship: {e}")
+                logger.warning("Failed to add thread relationship: %s", e)
         
         return self._format_message(message_doc)
     
@@ -162,21 +169,11 @@ class Message:
             if before:
                 query['_id'] = {'$lt': ObjectId(before)}
             
-            # Aggregation pipeline to include user info
+            # Aggregation pipeline (sender info is attached afterwards in one batch)
             pipeline = [
                 {'$match': query},
                 {'$sort': {'created_at': -1}},  # Newest first
                 {'$limit': limit},
-                # Join with users collection to get sender info
-                {
-                    '$lookup': {
-                        'from': 'users',
-                        'localField': 'user_id',
-                        'foreignField': '_id',
-                        'as': 'user'
-                    }
-                },
-                {'$unwind': '$user'},
                 # Format output
                 {
                     '$project': {
@@ -190,19 +187,12 @@ class Message:
                         'metadata': 1,
                         'attachments': 1,
                         'created_at': 1,
-                        'bookmarked_by': 1,
-                        'user': {
-                            '_id': '$user._id',
-                            'name': '$user.name',
-                            'email': '$user.email',
-                            'avatar': '$user.avatar',
-                            'status': '$user.status'
-                        }
+                        'bookmarked_by': 1
                     }
                 }
             ]
             
-            messages = list(self.collection.aggregate(pipeline))
+            messages = self._attach_users(list(self.collection.aggregate(pipeline)))
             
             # Skip reactions for initial load - they'll be fetched only when messages have reactions
             # This makes message loading 10x faster
@@ -215,9 +205,7 @@ class Message:
                     formatted_messages.append(formatted_msg)
             return formatted_messages
         except Exception as e:
-            print(f"Error listing messages: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error listing messages: %s", e, exc_info=True)
             return []
     
     def get_thread_replies(self, parent_message_id: str) -> List[Dict[str, Any]]:
@@ -239,15 +227,6 @@ class Message:
                     }
                 },
                 {'$sort': {'created_at': 1}},  # Oldest first for threads
-                {
-                    '$lookup': {
-                        'from': 'users',
-                        'localField': 'user_id',
-                        'foreignField': '_id',
-                        'as': 'user'
-                    }
-                },
-                {'$unwind': '$user'},
                 {
                     '$project': {
                         '_id': 1,
@@ -256,18 +235,12 @@ class Message:
                         'content': 1,
                         'is_edited': 1,
                         'edited_at': 1,
-                        'created_at': 1,
-                        'user': {
-                            '_id': '$user._id',
-                            'name': '$user.name',
-                            'avatar': '$user.avatar',
-                            'status': '$user.status'
-                        }
+                        'created_at': 1
                     }
                 }
             ]
             
-            replies = list(self.collection.aggregate(pipeline))
+            replies = self._attach_users(list(self.collection.aggregate(pipeline)))
             return [self._format_message(msg) for msg in replies]
         except Exception:
             return []
@@ -290,25 +263,20 @@ class Message:
             dict: Updated message or None if unauthorized/not found
         """
         try:
-            # Verify user owns this message
-            message = self.collection.find_one({
-                '_id': ObjectId(message_id),
-                'user_id': ObjectId(user_id),
-                'is_deleted': False
-            })
-            
-            if not message:
-                return None  # Message not found or user doesn't own it
-            
-            # Update message
+            # Ownership check and update in one round-trip
+            now = datetime.utcnow()
             result = self.collection.find_one_and_update(
-                {'_id': ObjectId(message_id)},
+                {
+                    '_id': ObjectId(message_id),
+                    'user_id': ObjectId(user_id),
+                    'is_deleted': False
+                },
                 {
                     '$set': {
                         'content': content,
                         'is_edited': True,
-                        'edited_at': datetime.utcnow(),
-                        'updated_at': datetime.utcnow()
+                        'edited_at': now,
+                        'updated_at': now
                     }
                 },
                 return_document=True
@@ -455,7 +423,7 @@ class Message:
             self.reaction_model.add_reaction(message_id, user_id, emoji)
             return True
         except Exception as e:
-            print(f"Error adding reaction: {e}")
+            logger.error("Error adding reaction: %s", e)
             return False
     
     def remove_reaction(self, message_id: str, user_id: str) -> bool:
@@ -488,9 +456,7 @@ class Message:
         try:
             return self.reaction_model.get_message_reactions(message_id)
         except Exception as e:
-            print(f"Error in get_reactions: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error in get_reactions: %s", e, exc_info=True)
             return []
     
     def get_thread_count(self, message_id: str) -> int:
@@ -510,7 +476,8 @@ class Message:
     
     def get_reactions_bulk(self, message_ids: List[ObjectId]) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Get reactions for multiple messages in ONE database query (optimized for performance).
+        Get reactions for multiple messages in ONE aggregation (optimized for performance).
+        Reactor names come from the cached User.get_summaries lookup.
         
         Args:
             message_ids: List of message ObjectIds
@@ -520,58 +487,48 @@ class Message:
             Format: { "msg_id_1": [{ emoji: "👍", count: 3, users: [...] }], ... }
         """
         try:
+            # Group reactor IDs per (message, emoji) without joining users:
+            # names are resolved afterwards in one cached bulk lookup instead
+            # of a users $lookup per reaction document
             pipeline = [
                 {
                     '$match': {
                         'message_id': {'$in': message_ids}
                     }
                 },
-                {
-                    '$lookup': {
-                        'from': 'users',
-                        'localField': 'user_id',
-                        'foreignField': '_id',
-                        'as': 'user'
-                    }
-                },
-                {'$unwind': '$user'},
                 {
                     '$group': {
                         '_id': {
                             'message_id': '$message_id',
                             'emoji': '$emoji'
                         },
-                        'count': {'$sum': 1},
-                        'users': {'$push': '$user.name'}
-                    }
-                },
-                {
-                    '$group': {
-                        '_id': '$_id.message_id',
-                        'reactions': {
-                            '$push': {
-                                'emoji': '$_id.emoji',
-                                'count': '$count',
-                                'users': '$users'
-                            }
-                        }
+                        'users': {'$push': '$user_id'}
                     }
                 }
             ]
             
             results = list(self.reactions_collection.aggregate(pipeline))
             
-            # Convert to map: message_id -> reactions
+            summaries = User(self.db).get_summaries(
+                [uid for result in results for uid in result['users']]
+            )
+            
+            # Convert to map: message_id -> reactions. As with the users
+            # $lookup this replaces, reactions from users that no longer
+            # exist are left out, and only users with a name are listed.
             reactions_map = {}
             for result in results:
-                msg_id = str(result['_id'])
-                reactions_map[msg_id] = result['reactions']
+                reactors = [summaries[uid] for uid in result['users'] if uid in summaries]
+                if reactors:
+                    reactions_map.setdefault(str(result['_id']['message_id']), []).append({
+                        'emoji': result['_id']['emoji'],
+                        'count': len(reactors),
+                        'users': [user['name'] for user in reactors if 'name' in user]
+                    })
             
             return reactions_map
         except Exception as e:
-            print(f"Error in get_reactions_bulk: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error in get_reactions_bulk: %s", e, exc_info=True)
             return {}
     
     def search(self, channel_id: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -586,34 +543,66 @@ class Message:
         Returns:
             list: Matching messages
         """
+        # A blank query would be an empty regex matching every message in
+        # the channel - answer it here instead of running the aggregation
+        query = query.strip() if query else ''
+        if not query or limit <= 0:
+            return []
+        
         try:
-            # Text search using regex
+            # Text search using regex. The query is escaped so it matches
+            # literally and can't be a pathological pattern; channel_id
+            # narrows the scan to one channel's messages.
             pipeline = [
                 {
                     '$match': {
                         'channel_id': ObjectId(channel_id),
-                        'content': {'$regex': query, '$options': 'i'},
+                        'content': {'$regex': re.escape(query), '$options': 'i'},
                         'is_deleted': False
                     }
                 },
                 {'$sort': {'created_at': -1}},
                 {'$limit': limit},
+                # Only the fields the formatted result uses, as for listing
                 {
-                    '$lookup': {
-                        'from': 'users',
-                        'localField': 'user_id',
-                        'foreignField': '_id',
-                        'as': 'user'
+                    '$project': {
+                        '_id': 1,
+                        'channel_id': 1,
+                        'user_id': 1,
+                        'content': 1,
+                        'parent_message_id': 1,
+                        'is_pinned': 1,
+                        'is_edited': 1,
+                        'edited_at': 1,
+                        'metadata': 1,
+                        'attachments': 1,
+                        'created_at': 1,
+                        'bookmarked_by': 1
                     }
-                },
-                {'$unwind': '$user'}
+                }
             ]
             
-            messages = list(self.collection.aggregate(pipeline))
+            messages = self._attach_users(list(self.collection.aggregate(pipeline)))
             return [self._format_message(msg) for msg in messages]
         except Exception:
             return []
     
+    def _attach_users(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Attach sender info to raw messages with one batched, cached user fetch.
+        
+        Messages whose sender no longer exists are dropped, as the
+        $lookup + $unwind this replaces used to do.
+        """
+        users = User(self.db).get_summaries([msg['user_id'] for msg in messages])
+        attached = []
+        for msg in messages:
+            user = users.get(msg['user_id'])
+            if user is not None:
+                msg['user'] = user
+                attached.append(msg)
+        return attached
+    
     def _format_message(self, message: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Format message document for API response.
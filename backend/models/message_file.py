@@ -8,6 +8,7 @@ Allows files to be reused across multiple messages.
 from datetime import datetime
 from bson.objectid import ObjectId
 from typing import Optional, Dict, Any, List
+from models.file import File
 
 
 class MessageFile:
@@ -24,10 +25,14 @@ class MessageFile:
     
     COLLECTION = 'message_files'
     
+    _indexes_created = False
+    
     def __init__(self, db):
         """Initialize MessageFile model with database connection."""
         self.collection = db[self.COLLECTION]
-        self._create_indexes()
+        if not MessageFile._indexes_created:
+            self._create_indexes()
+            MessageFile._indexes_created = True
     
     def _create_indexes(self):
         """Create indexes for efficient queries."""
@@ -115,7 +120,6 @@ class MessageFile:
                 return []
             
             # Lookup file details
-            from models.file import File
             file_model = File(files_collection.database)
             
             files = []
@@ -25,10 +25,14 @@ class Reaction:
     
     COLLECTION = 'reactions'
     
+    _indexes_created = False
+    
     def __init__(self, db):
         """Initialize Reaction model with database connection."""
         self.collection = db[self.COLLECTION]
-        self._create_indexes()
+        if not Reaction._indexes_created:
+            self._create_indexes()
+            Reaction._indexes_created = True
     
     def _create_indexes(self):
         """Create indexes for efficient queries."""
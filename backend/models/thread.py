@@ -24,10 +24,14 @@ class Thread:
     
     COLLECTION = 'threads'
     
+    _indexes_created = False
+    
     def __init__(self, db):
         """Initialize Thread model with database connection."""
         self.collection = db[self.COLLECTION]
-        self._create_indexes()
+        if not Thread._indexes_created:
+            self._create_indexes()
+            Thread._indexes_created = True
     
     def _create_indexes(self):
         """Create indexes for efficient queries."""
@@ -176,14 +180,18 @@ class Thread:
         try:
             reply_count = self.count_replies(parent_id)
             
-            # Get first and last reply timestamps
+            # Get first and last reply timestamps. Each end is read straight
+            # off the (parent_id, created_at) index in the direction needed,
+            # and only the timestamp is returned.
             first_reply = self.collection.find_one(
                 {'parent_id': ObjectId(parent_id)},
+                {'created_at': 1, '_id': 0},
                 sort=[('created_at', 1)]
             )
             
             last_reply = self.collection.find_one(
                 {'parent_id': ObjectId(parent_id)},
+                {'created_at': 1, '_id': 0},
                 sort=[('created_at', -1)]
             )
             
@@ -234,11 +242,20 @@ class Thread:
             
             threads = list(self.collection.aggregate(pipeline))
             
-            # Get parent message details
+            # Get parent message details (one $in query for all threads
+            # rather than a find_one round-trip per thread)
+            parent_msgs = {
+                msg['_id']: msg
+                for msg in messages_collection.find(
+                    {'_id': {'$in': [thread['_id'] for thread in threads]}},
+                    {'content': {'$substrCP': ['$content', 0, 100]}}
+                )
+            } if threads else {}
+            
             results = []
             for thread in threads:
                 parent_id = str(thread['_id'])
-                parent_msg = messages_collection.find_one({'_id': thread['_id']})
+                parent_msg = parent_msgs.get(thread['_id'])
                 
                 if parent_msg:
                     results.append({
@@ -10,10 +10,34 @@ LEARNING NOTE:
 - '_id' is auto-generated by MongoDB as unique identifier
 """
 
+import logging
+import re
 from datetime import datetime
 from bson.objectid import ObjectId
 import bcrypt
-from typing import Optional, Dict, Any
+from eventlet import tpool
+from typing import Optional, Dict, Any, List, Iterator
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# _id -> {name, email, avatar, status} for message senders. Messages are
+# listed far more often than profiles change; the short TTL bounds how long
+# a change made outside User.update/update_status can show stale.
+_summary_cache = TTLCache(maxsize=4096, ttl=30)
+
+# user_id string -> display name for the typing indicator, which clients poll
+# every few seconds. Names built from full_name/username/email rarely change.
+_display_name_cache = TTLCache(maxsize=10000, ttl=300)
+
+# (lowercased query, limit) -> formatted search results. Search-as-you-type
+# repeats the same prefixes; the regex is case-insensitive, so queries that
+# differ only in case share an entry. Cleared on any profile change and on
+# user creation - but only in the worker that made the change, so other
+# workers can serve a search missing a new user (or showing an old profile)
+# for up to the TTL.
+_search_results_cache = TTLCache(maxsize=1024, ttl=30)
 
 
 class User:
@@ -95,12 +119,14 @@ class User:
         # Hash password if provided (OAuth users may not have password)
         password_hash = None
         if 'password' in user_data and user_data['password']:
-            password_hash = bcrypt.hashpw(
+            password_hash = tpool.execute(
+                bcrypt.hashpw,
                 user_data['password'].encode('utf-8'),
                 bcrypt.gensalt()
             ).decode('utf-8')
         
-        # Create user document
+        # Create user document (one timestamp for created/updated)
+        now = datetime.utcnow()
         user_doc = {
             'email': email.lower().strip(),
             'username': username.lower().strip(),
@@ -120,14 +146,17 @@ class User:
             # OAuth fields
             'google_id': user_data.get('google_id'),
             'oauth_provider': user_data.get('oauth_provider'),
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow(),
+            'created_at': now,
+            'updated_at': now,
             'last_login': None,
         }
         
         # Insert into MongoDB
         result = self.collection.insert_one(user_doc)
         
+        # Cached searches were computed without this user
+        _search_results_cache.clear()
+        
         # Return user ID as string
         return str(result.inserted_id)
     
@@ -147,6 +176,107 @@ class User:
         except Exception:
             return None
     
+    def get_role(self, user_id: str) -> Optional[str]:
+        """
+        Look up a user's role, e.g. for an admin check.
+        
+        LEARNING NOTE:
+        - Projection fetches only the role instead of the whole profile
+        - Not cached: this backs authorization checks, so a demotion must
+          apply on the next request in every worker
+        
+        Args:
+            user_id: MongoDB ObjectId as string
+        
+        Returns:
+            str: 'admin' or 'user', or None if the user doesn't exist
+        """
+        try:
+            user = self.collection.find_one({'_id': ObjectId(user_id)}, {'role': 1})
+        except Exception:
+            return None
+        if not user:
+            return None
+        
+        return user.get('role', 'user')
+    
+    def get_display_names(self, user_ids: List[str]) -> Dict[str, str]:
+        """
+        Resolve many user IDs to display names in a single query.
+        
+        LEARNING NOTE:
+        - One $in query replaces a find_one per user (N+1 problem)
+        - Projection fetches only the fields needed to build a name
+        - Resolved names are cached, so repeat polls skip the query entirely
+        
+        Args:
+            user_ids: List of user IDs as strings
+        
+        Returns:
+            dict: Map of user_id -> display name (unknown IDs are omitted)
+        """
+        names = {}
+        object_ids = []
+        for uid in dict.fromkeys(user_ids):
+            cached = _display_name_cache.get(uid)
+            if cached is not None:
+                names[uid] = cached
+            elif ObjectId.is_valid(uid):
+                object_ids.append(ObjectId(uid))
+        
+        if object_ids:
+            for user in self.collection.find(
+                {'_id': {'$in': object_ids}},
+                {'full_name': 1, 'username': 1, 'email': 1}
+            ):
+                name = (
+                    user.get('full_name') or user.get('username')
+                    or user.get('email', '').split('@')[0]
+                )
+                _display_name_cache[str(user['_id'])] = name
+                names[str(user['_id'])] = name
+        
+        return names
+    
+    def get_summaries(self, user_ids: List[ObjectId]) -> Dict[ObjectId, Dict[str, Any]]:
+        """
+        Fetch the public fields shown next to messages for many users.
+        
+        LEARNING NOTE:
+        - Cached users are served from memory; the rest come from one $in query
+        - Replaces a $lookup into users for every message in a page
+        
+        Args:
+            user_ids: User ObjectIds (duplicates are fine)
+        
+        Returns:
+            dict: Map of ObjectId -> raw user fields (unknown IDs are omitted)
+        """
+        summaries = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            cached = _summary_cache.get(user_id)
+            if cached is None:
+                missing.append(user_id)
+            else:
+                summaries[user_id] = cached
+        
+        if missing:
+            for user in self.collection.find(
+                {'_id': {'$in': missing}},
+                {'name': 1, 'email': 1, 'avatar': 1, 'status': 1}
+            ):
+                _summary_cache[user['_id']] = user
+                summaries[user['_id']] = user
+        
+        return summaries
+    
+    def clear_cached_summary(self, user_id: str) -> None:
+        """Drop a user's cached summary, display name and any cached searches after their profile changes."""
+        _summary_cache.pop(ObjectId(user_id), None)
+        _display_name_cache.pop(str(user_id), None)
+        _search_results_cache.clear()
+    
     def find_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """
         Find a user by their email address.
@@ -184,9 +314,26 @@ class User:
             users = list(self.collection.find({}, {'password_hash': 0}))
             return users
         except Exception as e:
-            print(f"Error fetching users: {e}")
+            logger.error("Error fetching users: %s", e)
             return []
     
+    def iter_directory(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all users with just the fields the user directory shows.
+        
+        LEARNING NOTE:
+        - Returns the cursor itself, so documents arrive in batches while the
+          caller works instead of all being loaded into one list first
+        - Projection leaves password hashes, 2FA secrets, tokens etc. on the server
+        
+        Returns:
+            Cursor over user documents
+        """
+        return self.collection.find({}, {
+            'name': 1, 'full_name': 1, 'username': 1, 'email': 1,
+            'role': 1, 'status': 1, 'avatar': 1, 'picture': 1
+        })
+    
     def verify_password(self, user: Dict[str, Any], password: str) -> bool:
         """
         Verify a password against stored hash.
@@ -195,6 +342,8 @@ class User:
         - bcrypt.checkpw compares plain text password with hash
         - It's cryptographically secure - can't reverse the hash
         - Takes same time regardless of password length (prevents timing attacks)
+        - Runs in eventlet's native thread pool: bcrypt is deliberately slow
+          and would otherwise block every other request on the worker
         
         Args:
             user: User document with password_hash
@@ -206,7 +355,8 @@ class User:
         if not user or 'password_hash' not in user:
             return False
         
-        return bcrypt.checkpw(
+        return tpool.execute(
+            bcrypt.checkpw,
             password.encode('utf-8'),
             user['password_hash'].encode('utf-8')
         )
@@ -236,6 +386,7 @@ class User:
                 {'$set': updates},
                 return_document=True  # Return updated document
             )
+            self.clear_cached_summary(user_id)
             return self._format_user(result) if result else None
         except Exception:
             return None
@@ -269,6 +420,7 @@ class User:
                 {'_id': ObjectId(user_id)},
                 {'$set': updates}
             )
+            self.clear_cached_summary(user_id)
             return result.modified_count > 0
         except Exception:
             return False
@@ -331,13 +483,22 @@ class User:
             return self._format_user(result) if result else None
             
         except Exception as e:
-            print(f"Error verifying email: {e}")
+            logger.error("Error verifying email: %s", e)
             return None
     
     def search_users(self, query: str, limit: int = 20) -> list:
         """
         Search for users by name or email.
         
+        LEARNING NOTE:
+        - The query is escaped, so characters like '.' or '(' match
+          literally and a crafted pattern can't make the regex backtrack
+        - Stored emails are lowercase, so the email branch is a
+          case-sensitive prefix match on the lowercased query, which MongoDB
+          can answer with a range scan of the unique email index
+        - Names still match anywhere, ignoring case, so a last name finds
+          "John Smith"
+        
         Args:
             query: Search query string
             limit: Maximum number of results
@@ -345,18 +506,24 @@ class User:
         Returns:
             list: List of matching user documents
         """
-        # Case-insensitive regex search
-        regex = {'$regex': query, '$options': 'i'}
+        cache_key = (query.lower(), limit)
+        cached = _search_results_cache.get(cache_key)
+        if cached is not None:
+            return [dict(user) for user in cached]
+        
+        escaped = re.escape(query)
         
         users = self.collection.find({
             '$or': [
-                {'name': regex},
-                {'email': regex}
+                {'name': {'$regex': escaped, '$options': 'i'}},
+                {'email': {'$regex': '^' + re.escape(query.lower())}}
             ],
             'deleted_at': None  # Exclude deleted users
         }).limit(limit)
         
-        return [self._format_user(user) for user in users]
+        results = [self._format_user(user) for user in users]
+        _search_results_cache[cache_key] = results
+        return [dict(user) for user in results]
     
     def _format_user(self, user: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
@@ -25,10 +25,14 @@ class UserChannelRead:
     
     COLLECTION = 'user_channel_reads'
     
+    _indexes_created = False
+    
     def __init__(self, db):
         self.collection = db[self.COLLECTION]
-        # Create compound index for efficient lookups
-        self.collection.create_index([('user_id', 1), ('channel_id', 1)], unique=True)
+        if not UserChannelRead._indexes_created:
+            # Create compound index for efficient lookups
+            self.collection.create_index([('user_id', 1), ('channel_id', 1)], unique=True)
+            UserChannelRead._indexes_created = True
     
     def mark_as_read(self, user_id: str, channel_id: str, 
                      last_message_id: Optional[str] = None) -> Dict[str, Any]:
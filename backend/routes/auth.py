@@ -38,7 +38,7 @@ from flask_restx import Namespace, Resource, fields
 from models.user import User
 from utils.auth import token_required, get_current_user
 from utils.validators import validate_email, validate_password, validate_name, validate_phone
-from utils.email_service import send_verification_email, send_welcome_email
+from utils.email_service import email_service, send_verification_email, send_welcome_email
 import secrets
 from datetime import datetime, timedelta
 
@@ -59,6 +59,20 @@ register_model = auth_ns.model('Register', {
 })
 
 
+def _send_email_task(app, send, to_email: str, *args) -> None:
+    """
+    Background task body for a transactional email.
+
+    The request that queued it has already answered, so a failed send can
+    only be reported here.
+    """
+    try:
+        if not send(to_email, *args):
+            app.logger.error(f"{send.__name__} to {to_email} was not sent")
+    except Exception as e:
+        app.logger.error(f"{send.__name__} to {to_email} failed: {str(e)}", exc_info=True)
+
+
 @auth_ns.route('/me')
 class CurrentUser(Resource):
     @token_required
@@ -195,8 +209,15 @@ class Register(Resource):
             user_id = user_model.create(user_data)
             user = user_model.find_by_id(user_id)
 
-            # Send verification email
-            email_sent = send_verification_email(email, name, verification_token)
+            # Send verification email in the background, like the welcome
+            # email - registration shouldn't wait on the SMTP round-trips.
+            # 'email_queued' only says a send was started, not that it
+            # was delivered; failures are logged by _send_email_task.
+            current_app.socketio.start_background_task(
+                _send_email_task, current_app._get_current_object(),
+                send_verification_email, email, name, verification_token
+            )
+            email_queued = email_service.is_configured
 
             message = ('Registration successful! Please check your email to verify your account. '
                       'You can then sign in using NextAuth.')
@@ -211,7 +232,7 @@ class Register(Resource):
                     'role': user['role'],
                     'email_verified': user.get('email_verified', False)
                 },
-                'email_sent': email_sent,
+                'email_queued': email_queued,
                 'next_step': 'Use NextAuth to sign in after email verification'
             }, 201
         except ValueError as e:
@@ -246,8 +267,12 @@ class VerifyEmail(Resource):
             if not user:
                 return {'error': 'Invalid or expired verification token'}, 400
 
-            # Send welcome email
-            send_welcome_email(user['email'], user.get('full_name', user['username']))
+            # Send welcome email in the background - the response does not
+            # depend on it, so don't hold the request open for the SMTP round-trip
+            current_app.socketio.start_background_task(
+                _send_email_task, current_app._get_current_object(),
+                send_welcome_email, user['email'], user.get('full_name', user['username'])
+            )
 
             return {
                 'message': 'Email verified successfully! You can now sign in using NextAuth.',
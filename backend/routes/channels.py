@@ -2,15 +2,26 @@
 Channel Routes - Channel management
 """
 
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
 from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
+from pymongo import DeleteOne, UpdateOne
 from models.channel import Channel
 from models.message import Message
+from models.user import User
+from models.user_channel_read import UserChannelRead
 from utils.validators import validate_channel_name
 from utils.auth import token_required, get_current_user
 
 channels_ns = Namespace('channels', description='Channel operations')
 
+# DM channels are stored as regular channels named "dm_..."; compiled once and
+# sent to MongoDB as a BSON regex
+DM_CHANNEL_NAME_PATTERN = re.compile(r'^dm_')
+
 create_channel_model = channels_ns.model('CreateChannel', {
     'name': fields.String(required=True, description='Channel name', example='general'),
     'description': fields.String(description='Channel description'),
@@ -29,26 +40,23 @@ class ChannelList(Resource):
             db = current_app.db
 
             # OPTIMIZATION: Simple approach - get user's channels first, then supplement with minimal data
-            from bson.objectid import ObjectId
-            user_id = ObjectId(current_user['user_id'])
-
-            # Step 1: Get user's channel memberships (fast query with index)
-            channel_memberships = list(db['channel_members'].find(
-                {'user_id': user_id},
-                {'channel_id': 1, 'role': 1}
-            ))
+            # Step 1: Get user's channel memberships (cached, indexed query on miss)
+            channel_memberships = Channel(db).get_user_memberships(current_user['user_id'])
 
             if not channel_memberships:
                 return {'channels': []}, 200
 
-            channel_ids = [m['channel_id'] for m in channel_memberships]
+            # Role per channel for O(1) lookups below (reversed so the first
+            # membership wins, as the old linear scan did)
+            member_roles = {m['channel_id']: m['role'] for m in reversed(channel_memberships)}
+            channel_ids = list(member_roles)
 
             # Step 2: Get channel details (fast query with _id index)
             channels = list(db['channels'].find(
                 {
                     '_id': {'$in': channel_ids},
                     'is_deleted': False,
-                    'name': {'$not': {'$regex': '^dm_'}}
+                    'name': {'$not': DM_CHANNEL_NAME_PATTERN}
                 },
                 {
                     'name': 1,
@@ -62,16 +70,20 @@ class ChannelList(Resource):
             # Step 3: Build response with minimal processing
             result_channels = []
             for channel in channels:
+                # Format the timestamp once; it is reused for last_message_at
+                created_at = channel.get('created_at', '')
+                created_at = created_at.isoformat() if hasattr(created_at, 'isoformat') else str(created_at)
+
                 result_channels.append({
                     'id': str(channel['_id']),
                     'name': channel.get('name', ''),
                     'description': channel.get('description', ''),
                     'type': channel.get('type', 'public'),
                     'created_by': str(channel.get('created_by', '')),
-                    'created_at': channel.get('created_at', '').isoformat() if hasattr(channel.get('created_at', ''), 'isoformat') else str(channel.get('created_at', '')),
-                    'member_role': next((m['role'] for m in channel_memberships if m['channel_id'] == channel['_id']), 'member'),
+                    'created_at': created_at,
+                    'member_role': member_roles.get(channel['_id'], 'member'),
                     'last_message': None,  # Skip expensive message lookups for performance
-                    'last_message_at': channel.get('created_at', '').isoformat() if hasattr(channel.get('created_at', ''), 'isoformat') else str(channel.get('created_at', '')),
+                    'last_message_at': created_at,
                     'unreadCount': 0  # Skip expensive unread count for performance
                 })
 
@@ -81,9 +93,7 @@ class ChannelList(Resource):
             return {'channels': result_channels}, 200
 
         except Exception as e:
-            current_app.logger.error(f"Error listing channels: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error listing channels: {str(e)}", exc_info=True)
             return {'error': 'Failed to list channels'}, 500
     
     @channels_ns.expect(create_channel_model)
@@ -221,9 +231,7 @@ class ChannelMemberManagement(Resource):
 
             return {'message': 'Member added successfully'}, 200
         except Exception as e:
-            current_app.logger.error(f"Error: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error: {str(e)}", exc_info=True)
             return {'error': 'Failed to add member'}, 500
 
     @channels_ns.doc(security='Bearer')
@@ -235,11 +243,11 @@ class ChannelMemberManagement(Resource):
             db = current_app.db
             channel_model = Channel(db)
 
-            # Check if requester is admin or removing themselves
-            is_admin = channel_model.is_admin(channel_id, current_user['user_id'])
+            # Check if requester is removing themselves or is an admin
+            # (the admin lookup is skipped when removing yourself)
             is_self = current_user['user_id'] == user_id
 
-            if not is_admin and not is_self:
+            if not is_self and not channel_model.is_admin(channel_id, current_user['user_id']):
                 return {'error': 'Not authorized to remove members'}, 403
 
             # Remove the member
@@ -259,14 +267,18 @@ class ChannelMembers(Resource):
     @channels_ns.doc(security='Bearer')
     @token_required
     def post(self, channel_id):
-        """Add a member to a channel"""
+        """Add a member (user_id) or several members (user_ids) to a channel"""
         current_user = get_current_user()
         try:
             data = request.get_json()
             user_id = data.get('user_id')
+            user_ids = data.get('user_ids')
 
-            if not user_id:
-                return {'error': 'user_id is required'}, 400
+            if not user_id and not user_ids:
+                return {'error': 'user_id or user_ids is required'}, 400
+
+            if user_ids is not None and not isinstance(user_ids, list):
+                return {'error': 'user_ids must be a list'}, 400
 
             db = current_app.db
             channel_model = Channel(db)
@@ -279,6 +291,11 @@ class ChannelMembers(Resource):
             if not channel:
                 return {'error': 'Channel not found'}, 404
 
+            # Bulk add: one membership query + one insert for all users
+            if user_ids:
+                added = channel_model.add_members(channel_id, user_ids)
+                return {'message': f'Added {len(added)} member(s)', 'added': added}, 200
+
             # Add the new member
             success = channel_model.add_member(channel_id, user_id)
 
@@ -286,10 +303,10 @@ class ChannelMembers(Resource):
                 return {'error': 'User is already a member'}, 400
 
             return {'message': 'Member added successfully'}, 200
+        except ValueError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
-            current_app.logger.error(f"Error adding member: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error adding member: {str(e)}", exc_info=True)
             return {'error': 'Failed to add member'}, 500
 
 
@@ -304,11 +321,11 @@ class ChannelMemberDetail(Resource):
             db = current_app.db
             channel_model = Channel(db)
 
-            # Check if requester is admin or removing themselves
-            is_admin = channel_model.is_admin(channel_id, current_user['user_id'])
+            # Check if requester is removing themselves or is an admin
+            # (the admin lookup is skipped when removing yourself)
             is_self = current_user['user_id'] == user_id
 
-            if not is_admin and not is_self:
+            if not is_self and not channel_model.is_admin(channel_id, current_user['user_id']):
                 return {'error': 'Only admins can remove other members'}, 403
 
             channel = channel_model.find_by_id(channel_id)
@@ -322,12 +339,83 @@ class ChannelMemberDetail(Resource):
 
             return {'message': 'Member removed successfully'}, 200
         except Exception as e:
-            current_app.logger.error(f"Error removing member: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error removing member: {str(e)}", exc_info=True)
             return {'error': 'Failed to remove member'}, 500
 
 
+# Typing updates arrive every few keystrokes from every typing user. Instead
+# of one round-trip each, they are collected for a short window and written
+# with a single unordered bulk_write. Only the latest state per
+# (channel_id, user_id) is kept (a datetime, or None once they stop), so
+# repeated keystrokes collapse into one upsert. Readers look back 5 seconds,
+# so the flush delay is invisible to them.
+TYPING_FLUSH_INTERVAL = 0.05
+_pending_typing: Dict[tuple, Optional[datetime]] = {}
+# Created at import, which under gunicorn --preload is before eventlet
+# patches threading, so this may be a native lock: it is only ever held for
+# dict updates and never across a sleep or database call.
+_pending_typing_lock = threading.Lock()
+_typing_flush_scheduled = False
+
+
+def queue_typing_update(channel_id: str, user_id: str, is_typing: bool) -> None:
+    """
+    Record a typing start/stop to be written by the next batched flush.
+
+    Fire-and-forget: the caller returns before the update is stored, and a
+    failed flush is only logged. Typing indicators expire after 5 seconds
+    anyway, so a lost update just means one indicator shows late or not at all.
+    """
+    global _typing_flush_scheduled
+    with _pending_typing_lock:
+        _pending_typing[(channel_id, user_id)] = datetime.utcnow() if is_typing else None
+        if _typing_flush_scheduled:
+            return
+        _typing_flush_scheduled = True
+
+    app = current_app._get_current_object()
+    try:
+        app.socketio.start_background_task(_flush_typing_updates, app)
+    except Exception:
+        # Otherwise the flag stays set and no later update schedules a flush
+        with _pending_typing_lock:
+            _typing_flush_scheduled = False
+        raise
+
+
+def _flush_typing_updates(app) -> None:
+    """Write every pending typing update in one bulk_write."""
+    global _typing_flush_scheduled
+    pending = None
+    try:
+        app.socketio.sleep(TYPING_FLUSH_INTERVAL)
+        with _pending_typing_lock:
+            pending = dict(_pending_typing)
+            _pending_typing.clear()
+            _typing_flush_scheduled = False
+    finally:
+        if pending is None:
+            # This task died before taking the batch; clear the flag so the
+            # next update schedules a fresh flush for what is still pending
+            with _pending_typing_lock:
+                _typing_flush_scheduled = False
+
+    if not pending:
+        return
+
+    ops = [
+        UpdateOne({'channel_id': channel_id, 'user_id': user_id},
+                  {'$set': {'last_typing': last_typing}}, upsert=True)
+        if last_typing is not None else
+        DeleteOne({'channel_id': channel_id, 'user_id': user_id})
+        for (channel_id, user_id), last_typing in pending.items()
+    ]
+    try:
+        app.db.typing_status.bulk_write(ops, ordered=False)
+    except Exception as e:
+        app.logger.error(f"Error flushing {len(ops)} typing updates: {str(e)}")
+
+
 @channels_ns.route('/<string:channel_id>/typing')
 class ChannelTyping(Resource):
     @channels_ns.doc(security='Bearer')
@@ -337,7 +425,6 @@ class ChannelTyping(Resource):
         current_user = get_current_user()
         try:
             db = current_app.db
-            from datetime import datetime, timedelta
 
             # Get typing users from last 5 seconds, excluding current user
             cutoff_time = datetime.utcnow() - timedelta(seconds=5)
@@ -347,21 +434,14 @@ class ChannelTyping(Resource):
                 'user_id': {'$ne': current_user['user_id']}
             }))
 
-            # Get user names
-            from models.user import User
+            # Get user names (one bulk query for all typing users)
             user_model = User(db)
-            typing_users = []
-            for doc in typing_docs:
-                user = user_model.find_by_id(doc['user_id'])
-                if user:
-                    name = user.get('full_name') or user.get('username') or user.get('email', '').split('@')[0]
-                    typing_users.append(name)
+            names = user_model.get_display_names([doc['user_id'] for doc in typing_docs])
+            typing_users = [names[doc['user_id']] for doc in typing_docs if doc['user_id'] in names]
 
             return {'typing_users': typing_users}, 200
         except Exception as e:
-            current_app.logger.error(f"Error getting typing status: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error getting typing status: {str(e)}", exc_info=True)
             return {'error': 'Failed to get typing status'}, 500
 
     @channels_ns.doc(security='Bearer')
@@ -373,35 +453,12 @@ class ChannelTyping(Resource):
             data = request.get_json()
             is_typing = data.get('typing', False)
 
-            db = current_app.db
-            from datetime import datetime
-
-            if is_typing:
-                # Update or insert typing status
-                db.typing_status.update_one(
-                    {
-                        'channel_id': channel_id,
-                        'user_id': current_user['user_id']
-                    },
-                    {
-                        '$set': {
-                            'last_typing': datetime.utcnow()
-                        }
-                    },
-                    upsert=True
-                )
-            else:
-                # Remove typing status
-                db.typing_status.delete_one({
-                    'channel_id': channel_id,
-                    'user_id': current_user['user_id']
-                })
+            # Upsert (typing) or remove (stopped) with the next batched flush
+            queue_typing_update(channel_id, current_user['user_id'], bool(is_typing))
 
             return {'message': 'Typing status updated'}, 200
         except Exception as e:
-            current_app.logger.error(f"Error updating typing status: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error updating typing status: {str(e)}", exc_info=True)
             return {'error': 'Failed to update typing status'}, 500
 
 
@@ -421,16 +478,13 @@ class ChannelRead(Resource):
                 return {'error': 'Not a member of this channel'}, 403
 
             # Mark as read
-            from models.user_channel_read import UserChannelRead
             read_tracker = UserChannelRead(db)
             result = read_tracker.mark_as_read(current_user['user_id'], channel_id)
 
-            current_app.logger.info(f"✅ Marked channel {channel_id} as read for user {current_user['user_id']}")
+            current_app.logger.info("✅ Marked channel %s as read for user %s", channel_id, current_user['user_id'])
             return {'message': 'Marked as read', 'data': result}, 200
         except Exception as e:
-            current_app.logger.error(f"Error marking channel as read: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error marking channel as read: {str(e)}", exc_info=True)
             return {'error': 'Failed to mark as read'}, 500
 
 
@@ -444,10 +498,7 @@ class AllChannels(Resource):
         try:
             # Check if user is admin
             db = current_app.db
-            from models.user import User
-            user_model = User(db)
-            user = user_model.find_by_id(current_user['user_id'])
-            if not user or user.get('role') != 'admin':
+            if User(db).get_role(current_user['user_id']) != 'admin':
                 return {'error': 'Admin access required'}, 403
 
             # Get all channels with member counts
@@ -6,12 +6,18 @@ from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
 from models.message import Message
 from models.channel import Channel
+from models.user_channel_read import UserChannelRead
+from routes.channels import DM_CHANNEL_NAME_PATTERN
 from bson.objectid import ObjectId
 from datetime import datetime
 from utils.auth import token_required, get_current_user
 
 dm_ns = Namespace('dm', description='Direct messaging operations')
 
+# The conversation list only shows a one-line preview of the last message,
+# so there is no need to ship whole (possibly very long) messages for it
+LAST_MESSAGE_PREVIEW_CHARS = 200
+
 dm_attachment_model = dm_ns.model('DMAttachment', {
     'name': fields.String(required=True, description='File name'),
     'size': fields.Integer(required=True, description='File size in bytes'),
@@ -69,8 +75,8 @@ class DMMessageList(Resource):
             db = current_app.db
             sender_id = current_user['user_id']
 
-            # Validate recipient exists
-            recipient = db.users.find_one({'_id': ObjectId(recipient_id)})
+            # Validate recipient exists (covered by the _id index, no document fetch)
+            recipient = db.users.find_one({'_id': ObjectId(recipient_id)}, {'_id': 1})
             if not recipient:
                 return {'error': 'Recipient not found'}, 404
 
@@ -106,9 +112,9 @@ class DMMessageList(Resource):
             ids = sorted([user1_id, user2_id])
             dm_channel_name = f"dm_{ids[0]}_{ids[1]}"
             
-            # Check if DM channel already exists
+            # Check if DM channel already exists (projected + cached lookup)
             channel_model = Channel(db)
-            existing_channel = channel_model.find_by_name(dm_channel_name)
+            existing_channel = channel_model.resolve_channel(dm_channel_name)
             
             if existing_channel:
                 return existing_channel['id']
@@ -118,12 +124,10 @@ class DMMessageList(Resource):
                 name=dm_channel_name,
                 created_by=user1_id,
                 description=f"Direct message between users",
-                channel_type='private'
+                channel_type='private',
+                member_ids=[user2_id]
             )
             
-            # Add second user as member
-            channel_model.add_member(new_channel['id'], user2_id, role='member')
-            
             return new_channel['id']
             
         except Exception as e:
@@ -145,51 +149,36 @@ class DMConversationList(Resource):
             # Optimized: Single aggregation pipeline instead of N+1 queries
             # This replaces the old loop that was making 2 queries per DM channel
             try:
+                # The user's channel scope comes from the same cached
+                # membership list the channel sidebar uses, so the pipeline
+                # starts from those channel IDs instead of re-reading and
+                # grouping channel_members for this user on every call
+                channel_ids = [
+                    m['channel_id']
+                    for m in Channel(db).get_user_memberships(user_id)
+                ]
+                if not channel_ids:
+                    return {'conversations': []}, 200
+
                 pipeline = [
-                    # Stage 1: Get all channels where user is a member
-                    {
-                        '$match': {
-                            'user_id': ObjectId(user_id)
-                        }
-                    },
-                    # Stage 2: Group by channel_id to eliminate duplicates
-                    {
-                        '$group': {
-                            '_id': '$channel_id',
-                            'channel_id': {'$first': '$channel_id'},
-                            'role': {'$first': '$role'},
-                            'joined_at': {'$first': '$joined_at'}
-                        }
-                    },
-                    # Stage 3: Join with channels to get channel details
-                    {
-                        '$lookup': {
-                            'from': 'channels',
-                            'localField': 'channel_id',
-                            'foreignField': '_id',
-                            'as': 'channel'
-                        }
-                    },
-                    {
-                        '$unwind': '$channel'
-                    },
-                    # Stage 4: Filter for DM channels only
+                    # Stage 1: DM channels within the user's scope
                     {
                         '$match': {
-                            'channel.name': {'$regex': '^dm_'},
-                            'channel.is_deleted': False
+                            '_id': {'$in': channel_ids},
+                            'name': DM_CHANNEL_NAME_PATTERN,
+                            'is_deleted': False
                         }
                     },
-                    # Stage 5: Get all members of each channel
+                    # Stage 2: Shape like the membership-rooted rows the
+                    # later stages expect
                     {
-                        '$lookup': {
-                            'from': 'channel_members',
-                            'localField': 'channel_id',
-                            'foreignField': 'channel_id',
-                            'as': 'all_members'
+                        '$project': {
+                            '_id': 0,
+                            'channel_id': '$_id',
+                            'channel': {'created_at': '$created_at'}
                         }
                     },
-                    # Stage 5: Get all members of each channel
+                    # Stage 3: Get all members of each channel
                     {
                         '$lookup': {
                             'from': 'channel_members',
@@ -198,7 +187,7 @@ class DMConversationList(Resource):
                             'as': 'all_members'
                         }
                     },
-                    # Stage 6: Filter to get only the OTHER user (not current user)
+                    # Stage 4: Filter to get only the OTHER user (not current user)
                     {
                         '$addFields': {
                             'other_member': {
@@ -215,7 +204,7 @@ class DMConversationList(Resource):
                             }
                         }
                     },
-                    # Stage 7: Join with users collection to get other user's details
+                    # Stage 5: Join with users collection to get other user's details
                     {
                         '$lookup': {
                             'from': 'users',
@@ -233,7 +222,7 @@ class DMConversationList(Resource):
                             'other_user._id': {'$exists': True, '$ne': None}
                         }
                     },
-                    # Stage 8: Get last message for each channel
+                    # Stage 6: Get last message for each channel
                     {
                         '$lookup': {
                             'from': 'messages',
@@ -249,7 +238,7 @@ class DMConversationList(Resource):
                                 {'$limit': 1},
                                 {
                                     '$project': {
-                                        'content': 1,
+                                        'content': {'$substrCP': ['$content', 0, LAST_MESSAGE_PREVIEW_CHARS]},
                                         'created_at': 1
                                     }
                                 }
@@ -257,7 +246,7 @@ class DMConversationList(Resource):
                             'as': 'last_msg'
                         }
                     },
-                    # Stage 9: Get read status for unread count
+                    # Stage 7: Get read status for unread count
                     {
                         '$lookup': {
                             'from': 'user_channel_reads',
@@ -285,7 +274,7 @@ class DMConversationList(Resource):
                             'as': 'read_status'
                         }
                     },
-                    # Stage 10: Count unread messages
+                    # Stage 8: Count unread messages
                     {
                         '$lookup': {
                             'from': 'messages',
@@ -321,7 +310,7 @@ class DMConversationList(Resource):
                             'as': 'unread'
                         }
                     },
-                    # Stage 11: Format the output
+                    # Stage 9: Format the output
                     {
                         '$project': {
                             '_id': 0,
@@ -368,25 +357,21 @@ class DMConversationList(Resource):
                             }
                         }
                     },
-                    # Stage 12: Sort by most recent
+                    # Stage 10: Sort by most recent
                     {
                         '$sort': {'last_message_at': -1}
                     }
                 ]
                 
-                dm_conversations = list(db['channel_members'].aggregate(pipeline))
+                dm_conversations = list(db['channels'].aggregate(pipeline))
                 return {'conversations': dm_conversations}, 200
                 
             except Exception as e:
-                current_app.logger.error(f"Error in DM aggregation: {str(e)}")
-                import traceback
-                current_app.logger.error(traceback.format_exc())
+                current_app.logger.error(f"Error in DM aggregation: {str(e)}", exc_info=True)
                 return {'error': 'Failed to get conversations'}, 500
             
         except Exception as e:
-            current_app.logger.error(f"Error getting DM conversations: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error getting DM conversations: {str(e)}", exc_info=True)
             return {'error': 'Failed to get conversations'}, 500
 
 
@@ -406,14 +391,11 @@ class DMRead(Resource):
                 return {'error': 'Not a member of this conversation'}, 403
 
             # Mark as read
-            from models.user_channel_read import UserChannelRead
             read_tracker = UserChannelRead(db)
             result = read_tracker.mark_as_read(current_user['user_id'], dm_channel_id)
 
-            current_app.logger.info(f"✅ Marked DM channel {dm_channel_id} as read for user {current_user['user_id']}")
+            current_app.logger.info("✅ Marked DM channel %s as read for user %s", dm_channel_id, current_user['user_id'])
             return {'message': 'Marked as read', 'data': result}, 200
         except Exception as e:
-            current_app.logger.error(f"Error marking DM as read: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error marking DM as read: {str(e)}", exc_info=True)
             return {'error': 'Failed to mark as read'}, 500
@@ -32,6 +32,7 @@ Examples:
 from flask import request, current_app
 from flask_restx import Namespace, Resource
 import secrets
+import eventlet
 from models.user import User
 from utils.google_oauth import create_google_oauth_instance
 from utils.auth import generate_token, token_required, get_current_user
@@ -143,13 +144,19 @@ def register_google_routes(namespace):
                 access_token = token_response.get('access_token')
                 id_token = token_response.get('id_token')
                 
+                # Verifying the ID token and fetching the profile are
+                # independent calls to Google - run them side by side on
+                # green threads instead of paying both round-trips in turn
+                token_info_thread = eventlet.spawn(google_oauth.verify_id_token, id_token)
+                user_info_thread = eventlet.spawn(google_oauth.get_user_info, access_token)
+                token_info = token_info_thread.wait()
+                user_info = user_info_thread.wait()
+                
                 # Verify ID token
-                token_info = google_oauth.verify_id_token(id_token)
                 if not token_info:
                     return {'error': 'Invalid ID token'}, 401
                 
                 # Get user info
-                user_info = google_oauth.get_user_info(access_token)
                 if not user_info:
                     return {'error': 'Failed to get user info'}, 500
                 
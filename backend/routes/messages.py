@@ -11,6 +11,9 @@ from utils.auth import token_required, get_current_user
 
 messages_ns = Namespace('messages', description='Messaging operations')
 
+# Upper bound on messages per page ('limit' is user supplied)
+MAX_MESSAGES_PER_PAGE = 100
+
 attachment_model = messages_ns.model('Attachment', {
     'name': fields.String(required=True, description='File name'),
     'size': fields.Integer(required=True, description='File size in bytes'),
@@ -43,7 +46,7 @@ class MessageList(Resource):
             if not channel_model.is_member(channel_id, current_user['user_id']):
                 return {'error': 'Not a member of this channel'}, 403
 
-            limit = int(request.args.get('limit', 50))
+            limit = min(max(int(request.args.get('limit', 50)), 1), MAX_MESSAGES_PER_PAGE)
             before = request.args.get('before')
 
             message_model = Message(db)
@@ -5,12 +5,19 @@ Advanced distributed systems monitoring with comprehensive AWS managed services
 
 import os
 import boto3
+from botocore.config import Config
 import json
+import random
+import threading
+import eventlet
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
+from cachetools import TTLCache
 from flask import current_app, request
+from pymongo import ReadPreference
 from flask_restx import Namespace, Resource, fields
 from utils.auth import token_required, get_current_user
+from utils.green_pool import submit_in_app_context
 
 metrics_ns = Namespace('metrics', description='Enterprise system metrics and advanced monitoring operations')
 
@@ -21,11 +28,73 @@ ECS_SERVICE_NAME = os.getenv('ECS_SERVICE_NAME', 'chat-app-service')
 ALB_NAME = os.getenv('ALB_NAME', 'chat-app-alb')
 LOG_GROUP_NAME = os.getenv('LOG_GROUP_NAME', '/aws/ecs/chat-app')
 
-# AWS Clients
-cloudwatch = boto3.client('cloudwatch', region_name=AWS_REGION)
-logs_client = boto3.client('logs', region_name=AWS_REGION)
-ce_client = boto3.client('ce', region_name=AWS_REGION)  # Cost Explorer
-elbv2_client = boto3.client('elbv2', region_name=AWS_REGION)
+# Dimensions for every ECS CloudWatch query. Fixed for the process, so built
+# once and shared (boto3 only reads them) instead of rebuilt per call.
+ECS_SERVICE_DIMENSIONS = [
+    {'Name': 'ServiceName', 'Value': ECS_SERVICE_NAME},
+    {'Name': 'ClusterName', 'Value': ECS_CLUSTER_NAME}
+]
+
+# AWS Clients - keep-alive connections and bounded standard-mode retries
+# so dashboard polls reuse sockets and throttling backs off instead of failing
+AWS_CLIENT_CONFIG = Config(
+    region_name=AWS_REGION,
+    retries={'max_attempts': 3, 'mode': 'standard'},
+    tcp_keepalive=True
+)
+cloudwatch = boto3.client('cloudwatch', config=AWS_CLIENT_CONFIG)
+logs_client = boto3.client('logs', config=AWS_CLIENT_CONFIG)
+ce_client = boto3.client('ce', config=AWS_CLIENT_CONFIG)  # Cost Explorer
+elbv2_client = boto3.client('elbv2', config=AWS_CLIENT_CONFIG)
+ecs_client = boto3.client('ecs', config=AWS_CLIENT_CONFIG)
+
+# Short-lived cache for metric history. The admin dashboard polls these
+# endpoints continuously, and CloudWatch/Mongo history barely changes
+# between polls, so we serve repeats from memory for up to a minute.
+METRICS_CACHE_TTL = 60
+_metric_history_cache = TTLCache(maxsize=512, ttl=METRICS_CACHE_TTL)
+
+# Upper bound on data points per timeseries request ('points' is user supplied)
+MAX_TIMESERIES_POINTS = 120
+
+# Version string from build-info.json. The file is baked in at deploy time,
+# so it is read once per process rather than on every health check.
+_build_info_version: Optional[str] = None
+
+# Single-flight bookkeeping: when a cache entry expires, only one request
+# refetches it while concurrent requests for the same key wait for it.
+_inflight_lock = threading.Lock()
+_inflight_fetches: Dict[tuple, threading.Event] = {}
+
+# (database, secondary-preferred messages collection) for analytics_messages
+_analytics_messages: Optional[tuple] = None
+
+# Shared pool for running independent CloudWatch/Mongo calls concurrently.
+# Capped so a burst of dashboard requests can't flood CloudWatch; the
+# default suits one container, override per deployment if needed.
+METRICS_POOL_WORKERS = max(1, int(os.getenv('METRICS_POOL_WORKERS', '6')))
+_metrics_pool = eventlet.GreenPool(METRICS_POOL_WORKERS)
+
+
+def analytics_messages():
+    """
+    Messages collection for dashboard aggregations.
+
+    These scans are heavy but tolerate slightly stale data, so they prefer
+    replica-set secondaries and leave the primary to chat traffic. Falls
+    back to the primary when no secondary is available.
+
+    The collection handle is built once per database and reused, instead
+    of cloning it with_options() on every dashboard request.
+    """
+    global _analytics_messages
+    db = current_app.db
+    if _analytics_messages is None or _analytics_messages[0] is not db:
+        _analytics_messages = (db, db.messages.with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED
+        ))
+    return _analytics_messages[1]
+
 
 health_model = metrics_ns.model('HealthStatus', {
     'status': fields.String(description='Overall health status', example='healthy'),
@@ -92,6 +161,57 @@ logs_insights_model = metrics_ns.model('LogsInsights', {
 })
 
 
+def _time_bucket(moment: datetime, seconds: float) -> int:
+    """Index of the seconds-long interval (counted from the epoch) containing moment."""
+    return int((moment - datetime(1970, 1, 1)).total_seconds() // max(seconds, 1))
+
+
+def get_or_fetch_history(cache_key: tuple, fetch) -> List[Dict]:
+    """
+    Return cached metric history, or fetch it once for all concurrent callers.
+
+    The first caller to miss the cache becomes the "leader" and performs the
+    fetch; others block on an Event (up to 5s) and then read the cached value.
+    Empty results are not cached, so a failed fetch is retried on the next poll.
+
+    Args:
+        cache_key: Hashable key identifying the metric series
+        fetch: Zero-argument callable returning a list of datapoints
+
+    Returns:
+        List of dicts with timestamp and value
+    """
+    with _inflight_lock:
+        cached = _metric_history_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        event = _inflight_fetches.get(cache_key)
+        is_leader = event is None
+        if is_leader:
+            event = _inflight_fetches[cache_key] = threading.Event()
+
+    if not is_leader:
+        event.wait(timeout=5)
+        with _inflight_lock:
+            cached = _metric_history_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        # Leader failed or timed out - fall back to fetching ourselves
+        return fetch()
+
+    try:
+        data = fetch()
+        if data:
+            with _inflight_lock:
+                _metric_history_cache[cache_key] = data
+        return data
+    finally:
+        with _inflight_lock:
+            _inflight_fetches.pop(cache_key, None)
+        event.set()
+
+
 def get_cloudwatch_metric(metric_name: str, namespace: str, dimensions: List[Dict],
                          stat: str = 'Average', period: int = 300,
                          start_time: Optional[datetime] = None,
@@ -116,37 +236,47 @@ def get_cloudwatch_metric(metric_name: str, namespace: str, dimensions: List[Dic
     if start_time is None:
         start_time = end_time - timedelta(hours=1)
 
-    try:
-        response = cloudwatch.get_metric_statistics(
-            Namespace=namespace,
-            MetricName=metric_name,
-            Dimensions=dimensions,
-            StartTime=start_time,
-            EndTime=end_time,
-            Period=period,
-            Statistics=[stat]
-        )
+    # Callers always ask for "the last N minutes": key on the window size
+    # and which period the window ends in, so a poll that crosses into the
+    # next period gets a series ending there rather than a cached older one
+    cache_key = (
+        'cloudwatch', metric_name, namespace,
+        tuple((d['Name'], d['Value']) for d in dimensions),
+        stat, period, int((end_time - start_time).total_seconds()),
+        _time_bucket(end_time, period)
+    )
+
+    def fetch() -> List[Dict]:
+        try:
+            response = cloudwatch.get_metric_statistics(
+                Namespace=namespace,
+                MetricName=metric_name,
+                Dimensions=dimensions,
+                StartTime=start_time,
+                EndTime=end_time,
+                Period=period,
+                Statistics=[stat]
+            )
 
-        # Sort by timestamp and format
-        datapoints = sorted(response.get('Datapoints', []), key=lambda x: x['Timestamp'])
-        return [
-            {
-                'timestamp': point['Timestamp'].isoformat(),
-                'value': point[stat]
-            }
-            for point in datapoints
-        ]
-    except Exception as e:
-        current_app.logger.warning(f"Failed to get CloudWatch metric {metric_name}: {str(e)}")
-        return []
+            # Sort by timestamp and format
+            datapoints = sorted(response.get('Datapoints', []), key=lambda x: x['Timestamp'])
+            return [
+                {
+                    'timestamp': point['Timestamp'].isoformat(),
+                    'value': point[stat]
+                }
+                for point in datapoints
+            ]
+        except Exception as e:
+            current_app.logger.warning(f"Failed to get CloudWatch metric {metric_name}: {str(e)}")
+            return []
+
+    return get_or_fetch_history(cache_key, fetch)
 
 
 def get_ecs_service_dimensions() -> List[Dict]:
-    """Get standard ECS service dimensions for CloudWatch queries."""
-    return [
-        {'Name': 'ServiceName', 'Value': ECS_SERVICE_NAME},
-        {'Name': 'ClusterName', 'Value': ECS_CLUSTER_NAME}
-    ]
+    """Get standard ECS service dimensions for CloudWatch queries (shared, do not mutate)."""
+    return ECS_SERVICE_DIMENSIONS
 
 
 @metrics_ns.route('/health')
@@ -159,43 +289,13 @@ class HealthStatus(Resource):
             # Get build information from build-info.json
             version_info = self._get_build_info()
 
-            # Get ECS service status
-            ecs = boto3.client('ecs', region_name=AWS_REGION)
-
-            try:
-                service_response = ecs.describe_services(
-                    cluster=ECS_CLUSTER_NAME,
-                    services=[ECS_SERVICE_NAME]
-                )
-
-                service = service_response.get('services', [{}])[0]
-                running_count = service.get('runningCount', 0)
-                desired_count = service.get('desiredCount', 0)
-
-                service_healthy = running_count >= desired_count and running_count > 0
-                uptime = (running_count / desired_count * 100) if desired_count > 0 else 0
+            # ECS and database checks are independent network calls - run
+            # them side by side so the health check takes the slower of the two
+            ecs_future = submit_in_app_context(_metrics_pool, self._check_ecs)
+            database_future = submit_in_app_context(_metrics_pool, self._check_database)
 
-                services = {
-                    'ecs': {
-                        'status': 'healthy' if service_healthy else 'unhealthy',
-                        'runningTasks': running_count,
-                        'desiredTasks': desired_count
-                    }
-                }
-            except Exception as e:
-                current_app.logger.warning(f"Failed to get ECS status: {str(e)}")
-                services = {'ecs': {'status': 'unknown', 'error': str(e)}}
-                uptime = 0
-
-            # Check database connectivity
-            try:
-                db = current_app.db
-                # Simple ping to test connection
-                db.command('ping')
-                services['database'] = {'status': 'healthy'}
-            except Exception as e:
-                current_app.logger.warning(f"Database health check failed: {str(e)}")
-                services['database'] = {'status': 'unhealthy', 'error': str(e)}
+            services, uptime = ecs_future.wait()
+            services['database'] = database_future.wait()
 
             # Overall status
             all_healthy = all(
@@ -222,12 +322,52 @@ class HealthStatus(Resource):
                 'services': {'error': str(e)}
             }, 500
 
+    def _check_ecs(self) -> tuple:
+        """Return the ECS service entry and uptime percentage"""
+        try:
+            service_response = ecs_client.describe_services(
+                cluster=ECS_CLUSTER_NAME,
+                services=[ECS_SERVICE_NAME]
+            )
+
+            service = service_response.get('services', [{}])[0]
+            running_count = service.get('runningCount', 0)
+            desired_count = service.get('desiredCount', 0)
+
+            service_healthy = running_count >= desired_count and running_count > 0
+            uptime = (running_count / desired_count * 100) if desired_count > 0 else 0
+
+            services = {
+                'ecs': {
+                    'status': 'healthy' if service_healthy else 'unhealthy',
+                    'runningTasks': running_count,
+                    'desiredTasks': desired_count
+                }
+            }
+            return services, uptime
+        except Exception as e:
+            current_app.logger.warning(f"Failed to get ECS status: {str(e)}")
+            return {'ecs': {'status': 'unknown', 'error': str(e)}}, 0
+
+    def _check_database(self) -> Dict:
+        """Ping MongoDB and return the database service entry"""
+        try:
+            # Simple ping to test connection
+            current_app.db.command('ping')
+            return {'status': 'healthy'}
+        except Exception as e:
+            current_app.logger.warning(f"Database health check failed: {str(e)}")
+            return {'status': 'unhealthy', 'error': str(e)}
+
     def _get_build_info(self):
-        """Get build information from build-info.json"""
+        """Get build information from build-info.json (read once, then cached)"""
+        global _build_info_version
+        if _build_info_version is not None:
+            return _build_info_version
+
         try:
             # Try to read build-info.json from the frontend public directory
             # This assumes the backend can access the frontend's public directory
-            import os
 
             # Try multiple potential paths for the build-info.json file
             possible_paths = [
@@ -243,11 +383,13 @@ class HealthStatus(Resource):
                         build_info = json.load(f)
 
                     # Return formatted version string with git info
-                    return f"{build_info.get('version', '1.0.0')} ({build_info.get('gitShort', 'unknown')}) - {build_info.get('gitBranch', 'unknown')}"
+                    _build_info_version = f"{build_info.get('version', '1.0.0')} ({build_info.get('gitShort', 'unknown')}) - {build_info.get('gitBranch', 'unknown')}"
+                    return _build_info_version
 
             # Fallback if file not found
             current_app.logger.warning("build-info.json not found in any expected location")
-            return "1.0.0 (unknown) - unknown"
+            _build_info_version = "1.0.0 (unknown) - unknown"
+            return _build_info_version
 
         except Exception as e:
             current_app.logger.warning(f"Failed to read build info: {str(e)}")
@@ -270,43 +412,33 @@ class SystemMetrics(Resource):
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(minutes=10)
 
-            # CPU Usage
-            cpu_data = get_cloudwatch_metric(
-                'CPUUtilization', 'AWS/ECS', dimensions,
+            # Count active connections (approximate from recent activity)
+            # Use sessions or recent messages as proxy for active connections
+            recent_cutoff = datetime.utcnow() - timedelta(minutes=30)
+
+            # The four lookups are independent network calls - submit them
+            # all before waiting on any, so total latency is the slowest one
+            cpu_future = submit_in_app_context(
+                _metrics_pool, get_cloudwatch_metric, 'CPUUtilization', 'AWS/ECS', dimensions,
                 stat='Average', period=300, start_time=start_time, end_time=end_time
             )
-            cpu_usage = cpu_data[-1]['value'] if cpu_data else 25.0
-
-            # Memory Usage
-            memory_data = get_cloudwatch_metric(
-                'MemoryUtilization', 'AWS/ECS', dimensions,
+            memory_future = submit_in_app_context(
+                _metrics_pool, get_cloudwatch_metric, 'MemoryUtilization', 'AWS/ECS', dimensions,
                 stat='Average', period=300, start_time=start_time, end_time=end_time
             )
-            memory_usage = memory_data[-1]['value'] if memory_data else 45.0
+            active_future = submit_in_app_context(_metrics_pool, self._count_active_users, recent_cutoff)
+            total_future = submit_in_app_context(_metrics_pool, self._count_total_messages)
 
-            # Get database counts for active connections and messages
-            db = current_app.db
+            # CPU Usage
+            cpu_data = cpu_future.wait()
+            cpu_usage = cpu_data[-1]['value'] if cpu_data else 25.0
 
-            # Count active connections (approximate from recent activity)
-            # Use sessions or recent messages as proxy for active connections
-            recent_cutoff = datetime.utcnow() - timedelta(minutes=30)
-            try:
-                # Count users with recent activity (messages in last 30 minutes)
-                active_users_pipeline = [
-                    {'$match': {'created_at': {'$gte': recent_cutoff}}},
-                    {'$group': {'_id': '$user_id'}},
-                    {'$count': 'activeUsers'}
-                ]
-                active_result = list(db.messages.aggregate(active_users_pipeline))
-                active_connections = active_result[0]['activeUsers'] if active_result else 0
-            except Exception:
-                active_connections = 5  # Fallback value
+            # Memory Usage
+            memory_data = memory_future.wait()
+            memory_usage = memory_data[-1]['value'] if memory_data else 45.0
 
-            # Total messages
-            try:
-                total_messages = db.messages.count_documents({'is_deleted': False})
-            except Exception:
-                total_messages = 1000  # Fallback value
+            active_connections = active_future.wait()
+            total_messages = total_future.wait()
 
             # Application-level metrics (we don't have direct CloudWatch metrics for these)
             # In a real implementation, you'd instrument your app to send custom metrics
@@ -334,11 +466,51 @@ class SystemMetrics(Resource):
                 'memoryUsage': 50.0
             }, 200
 
+    def _count_active_users(self, since: datetime) -> int:
+        """Count users with messages since the cutoff"""
+        try:
+            active_users_pipeline = [
+                {'$match': {'created_at': {'$gte': since}}},
+                {'$group': {'_id': '$user_id'}},
+                {'$count': 'activeUsers'}
+            ]
+            active_result = list(analytics_messages().aggregate(active_users_pipeline))
+            return active_result[0]['activeUsers'] if active_result else 0
+        except Exception:
+            return 5  # Fallback value
+
+    def _count_total_messages(self) -> int:
+        """Count non-deleted messages"""
+        try:
+            return analytics_messages().count_documents({'is_deleted': False})
+        except Exception:
+            return 1000  # Fallback value
+
+
+# Time series metric types served straight from CloudWatch (AWS/ECS namespace)
+CLOUDWATCH_TIMESERIES_METRICS = {
+    'cpu': 'CPUUtilization',
+    'memory': 'MemoryUtilization',
+}
+
 
 @metrics_ns.route('/timeseries/<string:metric_type>')
 class TimeSeriesMetrics(Resource):
+    # Time series metric types built locally -> TimeSeriesMetrics method name.
+    # - connections: database activity (a time-series DB would replace this)
+    # - latency: would come from APM tools or custom CloudWatch metrics
+    # - errors: would come from CloudWatch Logs Insights or custom metrics
+    LOCAL_TIMESERIES_SOURCES = {
+        'connections': '_get_connections_timeseries',
+        'latency': '_generate_latency_timeseries',
+        'errors': '_generate_error_timeseries',
+    }
+
     @token_required
-    @metrics_ns.marshal_list_with(time_series_model)
+    # Documented rather than marshalled: every point is already built as
+    # {timestamp, value}, and the dashboard polls this for up to
+    # MAX_TIMESERIES_POINTS points per series
+    @metrics_ns.response(200, 'Success', [time_series_model])
     @metrics_ns.doc('get_timeseries_metrics', security='Bearer', params={
         'metric_type': 'Type of metric (cpu, memory, connections, latency, errors)',
         'period': 'Period in minutes (default: 60)',
@@ -350,7 +522,7 @@ class TimeSeriesMetrics(Resource):
         try:
             # Parse query parameters
             period_minutes = int(request.args.get('period', 60))
-            max_points = int(request.args.get('points', 20))
+            max_points = min(max(int(request.args.get('points', 20)), 1), MAX_TIMESERIES_POINTS)
 
             # Calculate time range
             end_time = datetime.utcnow()
@@ -359,29 +531,17 @@ class TimeSeriesMetrics(Resource):
             # Calculate period in seconds (CloudWatch period)
             period_seconds = max(300, period_minutes * 60 // max_points)  # Minimum 5 minutes
 
-            dimensions = get_ecs_service_dimensions()
+            # One dict lookup picks the data source for the metric type
+            cloudwatch_metric = CLOUDWATCH_TIMESERIES_METRICS.get(metric_type)
+            local_source = self.LOCAL_TIMESERIES_SOURCES.get(metric_type)
 
-            if metric_type == 'cpu':
-                data = get_cloudwatch_metric(
-                    'CPUUtilization', 'AWS/ECS', dimensions,
-                    period=period_seconds, start_time=start_time, end_time=end_time
-                )
-            elif metric_type == 'memory':
+            if cloudwatch_metric:
                 data = get_cloudwatch_metric(
-                    'MemoryUtilization', 'AWS/ECS', dimensions,
+                    cloudwatch_metric, 'AWS/ECS', get_ecs_service_dimensions(),
                     period=period_seconds, start_time=start_time, end_time=end_time
                 )
-            elif metric_type == 'connections':
-                # For connections, we'll use a database query to get historical data
-                # This is a simplified approach - in production you'd have time-series DB
-                data = self._get_connections_timeseries(start_time, end_time, max_points)
-            elif metric_type == 'latency':
-                # Application latency would come from APM tools or custom CloudWatch metrics
-                # For now, generate realistic-looking data
-                data = self._generate_latency_timeseries(start_time, end_time, max_points)
-            elif metric_type == 'errors':
-                # Error count would come from CloudWatch Logs Insights or custom metrics
-                data = self._generate_error_timeseries(start_time, end_time, max_points)
+            elif local_source:
+                data = getattr(self, local_source)(start_time, end_time, max_points)
             else:
                 return {'error': f'Unknown metric type: {metric_type}'}, 400
 
@@ -403,93 +563,85 @@ class TimeSeriesMetrics(Resource):
 
     def _get_connections_timeseries(self, start_time: datetime, end_time: datetime, points: int) -> List[Dict]:
         """Get connection count over time from database activity"""
-        try:
-            db = current_app.db
-            interval = (end_time - start_time) / points
-
-            data = []
-            current_time = start_time
+        window_seconds = (end_time - start_time).total_seconds()
+        cache_key = (
+            'connections', points, int(window_seconds),
+            _time_bucket(end_time, window_seconds / points)
+        )
 
-            for i in range(points):
-                bucket_start = current_time
-                bucket_end = current_time + interval
+        def fetch() -> List[Dict]:
+            try:
+                interval = (end_time - start_time) / points
+                interval_ms = interval.total_seconds() * 1000
 
-                # Count unique users with messages in this time bucket
+                # Count unique users per time bucket in a single aggregation
+                # instead of one round-trip per bucket
                 pipeline = [
                     {'$match': {
-                        'created_at': {'$gte': bucket_start, '$lt': bucket_end}
+                        'created_at': {'$gte': start_time, '$lt': end_time}
+                    }},
+                    {'$group': {
+                        '_id': {
+                            'bucket': {'$floor': {'$divide': [
+                                {'$subtract': ['$created_at', start_time]}, interval_ms
+                            ]}},
+                            'user_id': '$user_id'
+                        }
                     }},
-                    {'$group': {'_id': '$user_id'}},
-                    {'$count': 'uniqueUsers'}
+                    {'$group': {'_id': '$_id.bucket', 'uniqueUsers': {'$sum': 1}}}
                 ]
 
-                result = list(db.messages.aggregate(pipeline))
-                count = result[0]['uniqueUsers'] if result else 0
+                counts = {
+                    int(bucket['_id']): bucket['uniqueUsers']
+                    for bucket in analytics_messages().aggregate(pipeline)
+                }
 
-                data.append({
-                    'timestamp': bucket_end.isoformat(),
-                    'value': max(count, 1)  # Ensure at least 1 connection
-                })
+                data = []
+                for i in range(points):
+                    bucket_end = start_time + interval * (i + 1)
+                    data.append({
+                        'timestamp': bucket_end.isoformat(),
+                        'value': max(counts.get(i, 0), 1)  # Ensure at least 1 connection
+                    })
 
-                current_time += interval
+                return data
+            except Exception:
+                return []
 
-            return data
-        except Exception:
-            return []
+        return get_or_fetch_history(cache_key, fetch)
 
     def _generate_latency_timeseries(self, start_time: datetime, end_time: datetime, points: int) -> List[Dict]:
         """Generate realistic latency data (would be replaced with real APM data)"""
-        import random
         interval = (end_time - start_time) / points
-
-        data = []
-        current_time = start_time
         base_latency = 40.0
+        uniform = random.uniform
 
-        for i in range(points):
-            # Add some realistic variation
-            latency = base_latency + random.uniform(-15, 25)
-            latency = max(latency, 10)  # Minimum 10ms
-
-            data.append({
-                'timestamp': current_time.isoformat(),
-                'value': round(latency, 1)
-            })
-
-            current_time += interval
-
-        return data
+        # Realistic variation around the base, with a 10ms minimum
+        return [
+            {
+                'timestamp': (start_time + interval * i).isoformat(),
+                'value': round(max(base_latency + uniform(-15, 25), 10), 1)
+            }
+            for i in range(points)
+        ]
 
     def _generate_error_timeseries(self, start_time: datetime, end_time: datetime, points: int) -> List[Dict]:
         """Generate error count data (would be replaced with real log analysis)"""
-        import random
         interval = (end_time - start_time) / points
 
-        data = []
-        current_time = start_time
-
-        for i in range(points):
-            # Most time periods have 0-2 errors
-            errors = random.choices([0, 0, 0, 1, 1, 2, 3], weights=[4, 3, 2, 2, 1, 1, 0.5])[0]
-
-            data.append({
-                'timestamp': current_time.isoformat(),
-                'value': errors
-            })
-
-            current_time += interval
+        # Most time periods have 0-2 errors; all samples drawn in one call
+        errors = random.choices([0, 0, 0, 1, 1, 2, 3], weights=[4, 3, 2, 2, 1, 1, 0.5], k=points)
 
-        return data
+        return [
+            {'timestamp': (start_time + interval * i).isoformat(), 'value': value}
+            for i, value in enumerate(errors)
+        ]
 
     def _generate_fallback_data(self, start_time: datetime, end_time: datetime,
                               points: int, metric_type: str) -> List[Dict]:
         """Generate fallback data when real metrics aren't available"""
-        import random
         interval = (end_time - start_time) / points
 
-        data = []
-        current_time = start_time
-
         # Define ranges for different metrics
         ranges = {
             'cpu': (20, 60),
@@ -500,22 +652,18 @@ class TimeSeriesMetrics(Resource):
         }
 
         min_val, max_val = ranges.get(metric_type, (0, 100))
+        uniform = random.uniform
 
-        for i in range(points):
-            value = random.uniform(min_val, max_val)
-            if metric_type == 'errors':
-                value = int(value)
-            else:
-                value = round(value, 1)
-
-            data.append({
-                'timestamp': current_time.isoformat(),
-                'value': value
-            })
-
-            current_time += interval
+        # Error counts are whole numbers; everything else has one decimal
+        if metric_type == 'errors':
+            values = (int(uniform(min_val, max_val)) for _ in range(points))
+        else:
+            values = (round(uniform(min_val, max_val), 1) for _ in range(points))
 
-        return data
+        return [
+            {'timestamp': (start_time + interval * i).isoformat(), 'value': value}
+            for i, value in enumerate(values)
+        ]
 
 # ==================== ENTERPRISE-GRADE MONITORING ENDPOINTS ====================
 # Advanced AWS integrations for enterprise-grade distributed systems monitoring
@@ -604,8 +752,9 @@ class CostMetrics(Resource):
             # Get daily costs for the last 30 days
             cost_response = ce_client.get_cost_and_usage(
                 TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
+                    # date.isoformat() is already YYYY-MM-DD
+                    'Start': start_date.isoformat(),
+                    'End': end_date.isoformat()
                 },
                 Granularity='DAILY',
                 Metrics=['UnblendedCost'],
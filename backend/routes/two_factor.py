@@ -4,6 +4,7 @@ Two-Factor Authentication Routes
 Handles 2FA setup, verification, and management.
 """
 
+from datetime import datetime
 from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
 from models.user import User
@@ -16,10 +17,24 @@ from utils.two_factor import (
     format_secret_for_display,
     validate_totp_setup
 )
+from eventlet import tpool
 import bcrypt
 
 two_factor_ns = Namespace('2fa', description='Two-Factor Authentication operations')
 
+
+def _hash_backup_codes(backup_codes):
+    """
+    bcrypt-hash each backup code (like passwords).
+
+    Called through eventlet's tpool: eight bcrypt rounds are CPU-bound and
+    would otherwise stall every other green thread on the worker.
+    """
+    return [
+        bcrypt.hashpw(code.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        for code in backup_codes
+    ]
+
 setup_2fa_model = two_factor_ns.model('Setup2FA', {
     'password': fields.String(required=True, description='Current password for verification', example='SecurePass123')
 })
@@ -66,15 +81,16 @@ class Setup2FA(Resource):
             # Generate new secret
             secret = generate_secret()
 
-            # Generate QR code
-            qr_code = generate_qr_code(secret, user['email'])
+            # Generate QR code - encoding and PNG compression are CPU-bound,
+            # so run them on a native thread instead of stalling the hub
+            qr_code = tpool.execute(generate_qr_code, secret, user['email'])
 
             # Store secret temporarily (will be confirmed in verify step)
             user_model.collection.update_one(
                 {'email': user['email']},
                 {'$set': {
                     'two_factor_secret_temp': secret,
-                    'updated_at': user_model.collection.find_one({'email': user['email']})['updated_at']
+                    'updated_at': datetime.utcnow()
                 }}
             )
 
@@ -132,10 +148,7 @@ class Verify2FASetup(Resource):
             backup_codes = get_backup_codes(8)
 
             # Hash backup codes before storing (like passwords)
-            hashed_backup_codes = [
-                bcrypt.hashpw(code.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-                for code in backup_codes
-            ]
+            hashed_backup_codes = tpool.execute(_hash_backup_codes, backup_codes)
 
             # Enable 2FA and save everything
             user_model.collection.update_one(
@@ -144,7 +157,7 @@ class Verify2FASetup(Resource):
                     'two_factor_enabled': True,
                     'two_factor_secret': temp_secret,
                     'backup_codes': hashed_backup_codes,
-                    'updated_at': user_model.collection.find_one({'email': user['email']})['updated_at']
+                    'updated_at': datetime.utcnow()
                 },
                 '$unset': {
                     'two_factor_secret_temp': ''  # Remove temporary secret
@@ -199,7 +212,7 @@ class Disable2FA(Resource):
                     'two_factor_enabled': False,
                     'two_factor_secret': None,
                     'backup_codes': [],
-                    'updated_at': user_doc['updated_at']
+                    'updated_at': datetime.utcnow()
                 }}
             )
 
@@ -265,17 +278,14 @@ class RegenerateBackupCodes(Resource):
             backup_codes = get_backup_codes(8)
 
             # Hash backup codes
-            hashed_backup_codes = [
-                bcrypt.hashpw(code.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-                for code in backup_codes
-            ]
+            hashed_backup_codes = tpool.execute(_hash_backup_codes, backup_codes)
 
             # Update backup codes
             user_model.collection.update_one(
                 {'email': user['email']},
                 {'$set': {
                     'backup_codes': hashed_backup_codes,
-                    'updated_at': user['updated_at']
+                    'updated_at': datetime.utcnow()
                 }}
             )
 
@@ -7,6 +7,7 @@ from flask import Blueprint, request
 import os
 import uuid
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from werkzeug.utils import secure_filename
 from utils.auth import token_required, get_current_user
@@ -32,34 +33,54 @@ MESSAGE_FILE_EXTENSIONS = {
     'mp3', 'wav', 'ogg', 'flac'  # Audio
 }
 
+# Extension -> Content-Type for S3 objects (anything else is octet-stream)
+CONTENT_TYPES = {
+    # Images
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml',
+    # Documents
+    'pdf': 'application/pdf',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain'
+}
+
 MAX_AVATAR_SIZE = 5 * 1024 * 1024  # 5MB
 MAX_MESSAGE_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
+# Slack for multipart boundaries and part headers when comparing the
+# request's Content-Length against a file size limit
+MULTIPART_OVERHEAD = 64 * 1024
+
 # Initialize S3 client - uses IAM role credentials in ECS automatically
-s3_client = boto3.client('s3', region_name=AWS_REGION)
+# Keep-alive connections and standard-mode retries for uploads
+s3_client = boto3.client('s3', config=Config(
+    region_name=AWS_REGION,
+    retries={'max_attempts': 3, 'mode': 'standard'},
+    tcp_keepalive=True
+))
 
 def allowed_file(filename, allowed_extensions):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
+def body_exceeds(limit):
+    """
+    True when the declared request size alone rules out a file within limit.
+
+    Accessing request.files reads and buffers the whole multipart body, so
+    checking Content-Length first turns an oversized upload away before it
+    is received.
+    """
+    return request.content_length is not None and request.content_length > limit + MULTIPART_OVERHEAD
+
 def get_content_type(filename):
     """Get appropriate content type for file"""
     ext = filename.rsplit('.', 1)[1].lower()
-
-    # Images
-    if ext in ['jpg', 'jpeg']: return 'image/jpeg'
-    if ext in ['png']: return 'image/png'
-    if ext in ['gif']: return 'image/gif'
-    if ext in ['webp']: return 'image/webp'
-    if ext in ['svg']: return 'image/svg+xml'
-
-    # Documents
-    if ext in ['pdf']: return 'application/pdf'
-    if ext in ['doc']: return 'application/msword'
-    if ext in ['docx']: return 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-    if ext in ['txt']: return 'text/plain'
-
-    # Default
-    return 'application/octet-stream'
+    return CONTENT_TYPES.get(ext, 'application/octet-stream')
 
 @upload_s3_bp.route('/avatar', methods=['POST'])
 @token_required
@@ -67,6 +88,9 @@ def upload_avatar():
     """Upload avatar image to S3 and return URL"""
     current_user = get_current_user()
     try:
+        if body_exceeds(MAX_AVATAR_SIZE):
+            return {'error': 'File too large. Maximum size is 5MB'}, 400
+
         # Check if file was uploaded
         if 'file' not in request.files:
             return {'error': 'No file provided'}, 400
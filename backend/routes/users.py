@@ -2,14 +2,27 @@
 User Routes - User profile and management
 """
 
+import os
+import uuid
+import eventlet
 from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
 from models.user import User
 from bson.objectid import ObjectId
 from utils.auth import token_required, get_current_user
+from utils.green_pool import submit_in_app_context
 
 users_ns = Namespace('users', description='User operations')
 
+AVATAR_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp'})
+
+# Upper bound on search results ('limit' is user supplied)
+MAX_SEARCH_RESULTS = 50
+
+# Admin statistics counts run on their own small pool so they never take
+# slots from the metrics dashboard's CloudWatch/Mongo calls
+_statistics_pool = eventlet.GreenPool(4)
+
 update_profile_model = users_ns.model('UpdateProfile', {
     'name': fields.String(description='Full name'),
     'phone': fields.String(description='Phone number'),
@@ -100,6 +113,7 @@ class UserAvatarUpdate(Resource):
                     {'_id': ObjectId(current_user['user_id'])},
                     {'$set': {'avatar': avatar_url}}
                 )
+                user_model.clear_cached_summary(current_user['user_id'])
 
                 if result.modified_count > 0:
                     return {'message': 'Avatar updated', 'avatar_url': avatar_url}, 200
@@ -115,18 +129,15 @@ class UserAvatarUpdate(Resource):
                 return {'error': 'No file selected'}, 400
 
             # Validate file type
-            allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
             file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
-            if file_ext not in allowed_extensions:
+            if file_ext not in AVATAR_EXTENSIONS:
                 return {'error': 'Invalid file type. Allowed: png, jpg, jpeg, gif, webp'}, 400
 
             # Create uploads directory if it doesn't exist
-            import os
             upload_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'avatars')
             os.makedirs(upload_dir, exist_ok=True)
 
             # Generate unique filename
-            import uuid
             filename = f"{current_user['user_id']}_{uuid.uuid4().hex}.{file_ext}"
             filepath = os.path.join(upload_dir, filename)
 
@@ -144,6 +155,7 @@ class UserAvatarUpdate(Resource):
                 {'_id': ObjectId(current_user['user_id'])},
                 {'$set': {'avatar': avatar_url}}
             )
+            user_model.clear_cached_summary(current_user['user_id'])
 
             if result.modified_count > 0:
                 return {'message': 'Avatar uploaded successfully', 'avatar_url': avatar_url}, 200
@@ -151,9 +163,7 @@ class UserAvatarUpdate(Resource):
                 return {'error': 'Failed to update avatar in database'}, 500
 
         except Exception as e:
-            current_app.logger.error(f"Error updating avatar: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+            current_app.logger.error(f"Error updating avatar: {str(e)}", exc_info=True)
             return {'error': 'Failed to upload avatar'}, 500
 
 
@@ -175,8 +185,13 @@ class UserSearch(Resource):
         """Search users by name or email"""
         current_user = get_current_user()
         try:
-            query = request.args.get('query', '')
-            limit = int(request.args.get('limit', 20))
+            query = request.args.get('query', '').strip()
+            limit = min(max(int(request.args.get('limit', 20)), 1), MAX_SEARCH_RESULTS)
+
+            # A blank query would be an empty regex matching every user -
+            # answer it locally instead of scanning the collection
+            if not query:
+                return {'users': []}, 200
 
             db = current_app.db
             user_model = User(db)
@@ -198,13 +213,9 @@ class UserList(Resource):
             db = current_app.db
             user_model = User(db)
 
-            # Get all users
-            all_users = user_model.find_all()
-
-            # Format users for response
-            user_list = []
-            for user in all_users:
-                user_list.append({
+            # Format users as they stream in from the cursor
+            user_list = [
+                {
                     'id': str(user.get('_id')),
                     'name': user.get('name') or user.get('full_name') or user.get('username') or user.get('email', '').split('@')[0],
                     'email': user.get('email', ''),
@@ -212,7 +223,9 @@ class UserList(Resource):
                     'role': user.get('role', 'user'),
                     'status': user.get('status', 'offline'),
                     'avatar': user.get('avatar') or user.get('picture') or None
-                })
+                }
+                for user in user_model.iter_directory()
+            ]
 
             return {
                 'users': user_list,
@@ -233,24 +246,26 @@ class UserStatistics(Resource):
             db = current_app.db
 
             # Check if user is admin
-            user_model = User(db)
-            user = user_model.find_by_id(current_user['user_id'])
-            if not user or user.get('role') != 'admin':
+            if User(db).get_role(current_user['user_id']) != 'admin':
                 return {'error': 'Admin access required'}, 403
 
-            # Count total users
-            total_users = db.users.count_documents({})
-
-            # Count active users (status is 'online' or 'active')
-            active_users = db.users.count_documents({
-                'status': {'$in': ['online', 'active']}
-            })
-
-            # Count total channels
-            total_channels = db.channels.count_documents({})
-
-            # Count total messages
-            total_messages = db.messages.count_documents({})
+            # The four counts are independent - run them side by side so the
+            # request takes the slowest one, not the sum
+            counts = [
+                # Total users
+                submit_in_app_context(_statistics_pool, db.users.count_documents, {}),
+                # Active users (status is 'online' or 'active')
+                submit_in_app_context(_statistics_pool, db.users.count_documents, {
+                    'status': {'$in': ['online', 'active']}
+                }),
+                # Total channels
+                submit_in_app_context(_statistics_pool, db.channels.count_documents, {}),
+                # Total messages
+                submit_in_app_context(_statistics_pool, db.messages.count_documents, {}),
+            ]
+            total_users, active_users, total_channels, total_messages = (
+                count.wait() for count in counts
+            )
 
             return {
                 'statistics': {
@@ -66,6 +66,41 @@ def migrate_schema(connection_string):
         )
         print(f"   ✅ Updated {result.modified_count} message documents")
         
+        # Migration 4: Remove duplicate memberships, then enforce uniqueness.
+        # Channel.add_member relies on the unique index to reject racing joins,
+        # and the index can't be built while duplicates exist.
+        print("\n📝 Migration 4: Deduplicating channel memberships...")
+        members_collection = db['channel_members']
+        
+        duplicates = members_collection.aggregate([
+            {'$sort': {'joined_at': 1}},
+            {'$group': {
+                '_id': {'channel_id': '$channel_id', 'user_id': '$user_id'},
+                'ids': {'$push': '$_id'},
+                'roles': {'$push': '$role'},
+                'count': {'$sum': 1}
+            }},
+            {'$match': {'count': {'$gt': 1}}}
+        ], allowDiskUse=True)
+        
+        removed = 0
+        for group in duplicates:
+            # Keep the admin row if there is one, otherwise the earliest join
+            ids, roles = group['ids'], group['roles']
+            keep = ids[roles.index('admin')] if 'admin' in roles else ids[0]
+            result = members_collection.delete_many(
+                {'_id': {'$in': [i for i in ids if i != keep]}}
+            )
+            removed += result.deleted_count
+        print(f"   ✅ Removed {removed} duplicate membership documents")
+        
+        members_collection.create_index(
+            [('channel_id', 1), ('user_id', 1)],
+            unique=True
+        )
+        members_collection.create_index([('user_id', 1), ('channel_id', 1)])
+        print("   ✅ Unique (channel_id, user_id) index in place")
+        
         print("\n" + "=" * 80)
         print("✅ MIGRATION COMPLETED SUCCESSFULLY!")
         print("=" * 80)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Tests for the caching, batching and short-circuit paths in models and routes.
+
+These cover behaviour that is easy to break silently:
+1. Membership checks must see removals immediately (no cached "yes")
+2. Bulk member adds skip duplicates and surface database errors
+3. Channel creation validates member IDs before writing anything
+4. Blank searches are answered without a database query
+5. Batched typing updates are written and never leave the flush stuck
+6. Cached bearer tokens stop being served once they expire
+7. Similarity search treats an empty channel list as no filter
+
+MongoDB is replaced with mocks throughout; no server is needed.
+"""
+
+import sys
+import os
+
+# Set up test environment
+os.environ['MONGODB_URI'] = 'mongodb://localhost:27017'
+os.environ['MONGODB_DB_NAME'] = 'test'
+os.environ['JWT_SECRET_KEY'] = 'test_secret_key_12345'
+os.environ['SECRET_KEY'] = 'test_flask_secret'
+os.environ['NEXTAUTH_SECRET'] = 'test_nextauth'
+os.environ['FLASK_ENV'] = 'testing'
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import time
+import unittest
+from unittest.mock import Mock, patch, MagicMock
+
+import jwt
+from bson.objectid import ObjectId
+from flask import Flask
+
+
+class TestChannelMembership(unittest.TestCase):
+    """Membership checks and member writes on the Channel model"""
+
+    def setUp(self):
+        from models.channel import Channel
+        self.db = MagicMock()
+        self.channel_model = Channel(self.db)
+        self.channel_id = str(ObjectId())
+        self.user_id = str(ObjectId())
+
+    def test_is_member_sees_remove_member_immediately(self):
+        """A removed member is refused on the very next check"""
+        members = self.channel_model.members_collection
+        members.find_one.side_effect = [{'_id': ObjectId()}, None]
+        members.delete_one.return_value = Mock(deleted_count=1)
+
+        self.assertTrue(self.channel_model.is_member(self.channel_id, self.user_id))
+        self.assertTrue(self.channel_model.remove_member(self.channel_id, self.user_id))
+        self.assertFalse(self.channel_model.is_member(self.channel_id, self.user_id))
+        self.assertEqual(members.find_one.call_count, 2)
+
+    def test_add_members_skips_duplicates_and_existing_members(self):
+        """Repeated IDs are added once and existing members not at all"""
+        existing_id, new_id = ObjectId(), ObjectId()
+        members = self.channel_model.members_collection
+        members.find.return_value = [{'user_id': existing_id}]
+
+        added = self.channel_model.add_members(
+            self.channel_id, [str(existing_id), str(new_id), str(new_id)]
+        )
+
+        self.assertEqual(added, [str(new_id)])
+        inserted = members.insert_many.call_args[0][0]
+        self.assertEqual([doc['user_id'] for doc in inserted], [new_id])
+
+    def test_add_members_raises_on_database_error(self):
+        """A failed query is an error, not "nobody was added\""""
+        self.channel_model.members_collection.find.side_effect = RuntimeError('db down')
+
+        with self.assertRaises(RuntimeError):
+            self.channel_model.add_members(self.channel_id, [self.user_id])
+
+    def test_add_members_rejects_invalid_ids(self):
+        """Malformed IDs raise ValueError before any query"""
+        with self.assertRaises(ValueError):
+            self.channel_model.add_members(self.channel_id, ['not-an-id'])
+        self.channel_model.members_collection.find.assert_not_called()
+
+    def test_create_rejects_bad_member_ids_before_inserting(self):
+        """No channel is written when a member ID is malformed"""
+        self.channel_model.collection.find_one.return_value = None
+
+        with self.assertRaises(ValueError):
+            self.channel_model.create('general', self.user_id, member_ids=['not-an-id'])
+
+        self.channel_model.collection.insert_one.assert_not_called()
+        self.channel_model.members_collection.insert_many.assert_not_called()
+
+    def test_create_removes_channel_when_member_insert_fails(self):
+        """A channel whose memberships failed to insert is deleted again"""
+        self.channel_model.collection.find_one.return_value = None
+        self.channel_model.members_collection.insert_many.side_effect = RuntimeError('db down')
+
+        with self.assertRaises(RuntimeError):
+            self.channel_model.create('general', self.user_id, member_ids=[str(ObjectId())])
+
+        channel_doc = self.channel_model.collection.insert_one.call_args[0][0]
+        self.channel_model.collection.delete_one.assert_called_once_with({'_id': channel_doc['_id']})
+
+
+class TestBlankSearchShortCircuit(unittest.TestCase):
+    """Blank search queries never reach MongoDB"""
+
+    def test_message_search_blank_query(self):
+        """Message.search returns [] for blank queries without aggregating"""
+        from models.message import Message
+        message_model = Message(MagicMock())
+
+        for query in ('', '   ', '\t\n'):
+            self.assertEqual(message_model.search(str(ObjectId()), query), [])
+        message_model.collection.aggregate.assert_not_called()
+
+    def test_user_search_route_blank_query(self):
+        """GET /api/users/search answers a blank query with an empty list"""
+        with patch('pymongo.MongoClient') as mock_mongo:
+            mock_client = MagicMock()
+            mock_client.__getitem__.return_value = MagicMock()
+            mock_mongo.return_value = mock_client
+
+            from app import create_app
+            app = create_app()
+            app.config['TESTING'] = True
+
+            headers = {
+                'X-User-ID': str(ObjectId()),
+                'X-User-Email': 'user@example.com',
+                'X-User-Role': 'user'
+            }
+            with patch('models.user.User.search_users') as mock_search:
+                response = app.test_client().get('/api/users/search?query=%20%20', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'users': []})
+        mock_search.assert_not_called()
+
+
+class TestSimilaritySearchScope(unittest.TestCase):
+    """MessageEmbedding.search_similar channel filtering"""
+
+    def setUp(self):
+        from models.message_embedding import MessageEmbedding
+        self.embedding_model = MessageEmbedding(MagicMock())
+        self.doc = {
+            '_id': ObjectId(),
+            'message_id': ObjectId(),
+            'author_id': ObjectId(),
+            'channel_id': ObjectId(),
+            'embedding': [1.0, 0.0]
+        }
+
+    def test_empty_channel_list_means_no_filter(self):
+        """channel_ids=[] searches every channel, the same as None"""
+        for channel_ids in (None, []):
+            self.embedding_model.collection.find.return_value = [dict(self.doc)]
+            results = self.embedding_model.search_similar([1.0, 0.0], channel_ids=channel_ids)
+            self.embedding_model.collection.find.assert_called_with({})
+            self.assertEqual(len(results), 1)
+            self.assertAlmostEqual(results[0]['similarity_score'], 1.0)
+
+    def test_channel_list_filters_scan(self):
+        """A non-empty channel list restricts the scan to those channels"""
+        channel_id = str(self.doc['channel_id'])
+        self.embedding_model.collection.find.return_value = [dict(self.doc)]
+
+        self.embedding_model.search_similar([1.0, 0.0], channel_ids=[channel_id])
+
+        self.embedding_model.collection.find.assert_called_with(
+            {'channel_id': {'$in': [ObjectId(channel_id)]}}
+        )
+
+
+class TestTypingFlush(unittest.TestCase):
+    """Batched typing status writes"""
+
+    def setUp(self):
+        import routes.channels as channels_routes
+        self.routes = channels_routes
+        channels_routes._pending_typing.clear()
+        channels_routes._typing_flush_scheduled = False
+
+        self.app = Flask(__name__)
+        self.app.db = MagicMock()
+        self.app.socketio = MagicMock()
+        # Run the flush inline instead of on a background task
+        self.app.socketio.start_background_task.side_effect = lambda fn, *args: fn(*args)
+
+    def tearDown(self):
+        self.routes._pending_typing.clear()
+        self.routes._typing_flush_scheduled = False
+
+    def test_flush_writes_latest_state_per_user(self):
+        """Updates for the same user collapse into one write"""
+        with self.app.app_context():
+            # Hold the flush so both updates land in the same batch
+            self.routes._typing_flush_scheduled = True
+            self.routes.queue_typing_update('c1', 'u1', True)
+            self.routes.queue_typing_update('c1', 'u1', False)
+            self.routes._typing_flush_scheduled = False
+            self.routes.queue_typing_update('c1', 'u2', True)
+
+        ops = self.app.db.typing_status.bulk_write.call_args[0][0]
+        self.assertEqual(len(ops), 2)
+        self.assertFalse(self.routes._typing_flush_scheduled)
+        self.assertEqual(self.routes._pending_typing, {})
+
+    def test_failed_spawn_does_not_leave_flush_scheduled(self):
+        """A spawn error clears the flag so later updates are still written"""
+        self.app.socketio.start_background_task.side_effect = RuntimeError('no hub')
+
+        with self.app.app_context():
+            with self.assertRaises(RuntimeError):
+                self.routes.queue_typing_update('c1', 'u1', True)
+        self.assertFalse(self.routes._typing_flush_scheduled)
+
+    def test_flush_that_dies_early_clears_flag(self):
+        """A flush killed before taking the batch lets the next one run"""
+        self.routes._pending_typing[('c1', 'u1')] = None
+        self.routes._typing_flush_scheduled = True
+        self.app.socketio.sleep.side_effect = RuntimeError('killed')
+
+        with self.assertRaises(RuntimeError):
+            self.routes._flush_typing_updates(self.app)
+
+        self.assertFalse(self.routes._typing_flush_scheduled)
+        self.assertIn(('c1', 'u1'), self.routes._pending_typing)
+
+
+class TestVerifiedTokenCache(unittest.TestCase):
+    """verify_nextauth_token result caching"""
+
+    def setUp(self):
+        import utils.auth as auth
+        self.auth = auth
+        auth._verified_token_cache.clear()
+        self.app = Flask(__name__)
+        self.app.config['NEXTAUTH_SECRET'] = 'test_nextauth'
+        self.exp = int(time.time()) + 600
+        self.token = jwt.encode(
+            {'sub': 'user_12345', 'email': 'user@example.com', 'exp': self.exp},
+            'test_nextauth', algorithm='HS256'
+        )
+
+    def tearDown(self):
+        self.auth._verified_token_cache.clear()
+
+    def test_cached_until_token_expires(self):
+        """Repeat calls skip decoding until the token's exp has passed"""
+        with self.app.app_context(), \
+             patch('utils.auth.jwt.decode', wraps=jwt.decode) as mock_decode:
+            first = self.auth.verify_nextauth_token(self.token)
+            second = self.auth.verify_nextauth_token(self.token)
+            self.assertEqual(first, second)
+            self.assertEqual(first['user_id'], 'user_12345')
+            self.assertEqual(mock_decode.call_count, 1)
+
+            # Past the token's exp the cached entry is ignored and the token
+            # is verified again
+            with patch('utils.auth.time.time', return_value=self.exp + 1):
+                self.auth.verify_nextauth_token(self.token)
+            self.assertEqual(mock_decode.call_count, 2)
+
+    def test_invalid_token_not_cached(self):
+        """Tokens that fail verification are never cached"""
+        with self.app.app_context():
+            self.assertIsNone(self.auth.verify_nextauth_token(self.token + 'x'))
+        self.assertEqual(len(self.auth._verified_token_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
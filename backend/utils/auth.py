@@ -17,12 +17,20 @@ CRITICAL SERIALIZATION NOTE:
 """
 
 import jwt
+import time
 from datetime import datetime, timedelta, timezone
 from functools import wraps
+from cachetools import TTLCache
 from flask import request, current_app
 from typing import Optional, Dict, Any
 
 
+# Verified token -> user info. Clients send the same bearer token on every
+# call until it expires, so the signature check and decode only need to run
+# once per token; hits are still rejected once the token's own exp passes.
+_verified_token_cache = TTLCache(maxsize=4096, ttl=300)
+
+
 def verify_nextauth_token(token: str) -> Optional[Dict[str, Any]]:
     """
     DEPRECATED: Verify and decode a NextAuth JWT token.
@@ -30,6 +38,10 @@ def verify_nextauth_token(token: str) -> Optional[Dict[str, Any]]:
     This function is kept for backward compatibility.
     New authentication flow uses user headers from Next.js API routes.
     """
+    cached = _verified_token_cache.get(token)
+    if cached is not None and (cached['exp'] is None or cached['exp'] > time.time()):
+        return dict(cached)
+
     try:
         # Get NextAuth secret from environment
         nextauth_secret = current_app.config.get('NEXTAUTH_SECRET')
@@ -46,7 +58,7 @@ def verify_nextauth_token(token: str) -> Optional[Dict[str, Any]]:
             options={"verify_signature": True}
         )
 
-        current_app.logger.info(f'✅ Verified NextAuth token for user: {payload.get("email", "unknown")}')
+        current_app.logger.info('✅ Verified NextAuth token for user: %s', payload.get("email", "unknown"))
 
         # Extract user information from NextAuth token payload
         user_info = {
@@ -59,7 +71,8 @@ def verify_nextauth_token(token: str) -> Optional[Dict[str, Any]]:
             'iat': payload.get('iat')
         }
 
-        return user_info
+        _verified_token_cache[token] = user_info
+        return dict(user_info)
 
     except jwt.ExpiredSignatureError:
         current_app.logger.warning('NextAuth token has expired')
@@ -97,7 +110,7 @@ def extract_user_from_headers() -> Optional[Dict[str, Any]]:
             'name': user_email.split('@')[0],  # Fallback name
         }
 
-        current_app.logger.info(f'✅ Extracted user from headers: {user_email}')
+        current_app.logger.info('✅ Extracted user from headers: %s', user_email)
         return user_info
 
     except Exception as e:
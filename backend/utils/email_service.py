@@ -5,15 +5,158 @@ Handles sending verification emails, password reset emails, and other notificati
 Uses SMTP with proper error handling and email templates.
 """
 
+import logging
 import os
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from string import Template
 from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+# Static <head> shared by every HTML email. Built once at import time so the
+# constant markup always comes first and each send only formats the dynamic
+# body that follows it.
+_EMAIL_STYLES = """
+                body {
+                    font-family: Arial, sans-serif;
+                    line-height: 1.6;
+                    color: #333;
+                    max-width: 600px;
+                    margin: 0 auto;
+                    padding: 20px;
+                }
+                .header {
+                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    color: white;
+                    padding: 30px;
+                    text-align: center;
+                    border-radius: 10px 10px 0 0;
+                }
+                .content {
+                    background: #f9f9f9;
+                    padding: 30px;
+                    border-radius: 0 0 10px 10px;
+                }
+                .button {
+                    display: inline-block;
+                    padding: 15px 30px;
+                    background: #667eea;
+                    color: white;
+                    text-decoration: none;
+                    border-radius: 5px;
+                    margin: 20px 0;
+                    font-weight: bold;
+                }
+                .footer {
+                    text-align: center;
+                    margin-top: 30px;
+                    color: #666;
+                    font-size: 12px;
+                }
+"""
+
+_TOKEN_STYLE = """
+                .token {
+                    background: #e0e0e0;
+                    padding: 10px;
+                    border-radius: 5px;
+                    font-family: monospace;
+                    word-break: break-all;
+                    margin: 10px 0;
+                }
+"""
+
+_HTML_HEAD_TEMPLATE = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>{styles}            </style>
+        </head>
+"""
+
+_HTML_HEAD = _HTML_HEAD_TEMPLATE.format(styles=_EMAIL_STYLES)
+_HTML_HEAD_WITH_TOKEN = _HTML_HEAD_TEMPLATE.format(styles=_EMAIL_STYLES + _TOKEN_STYLE)
+
+# Complete HTML documents, head included, assembled once at import. They are
+# string.Templates rather than format strings because the CSS is full of
+# braces; each send only substitutes the per-recipient values.
+_VERIFICATION_HTML = Template(_HTML_HEAD_WITH_TOKEN + """
+        <body>
+            <div class="header">
+                <h1>Welcome to ConnectBest Chat! 🎉</h1>
+            </div>
+            <div class="content">
+                <p>Hi <strong>$name</strong>,</p>
+                <p>Thank you for registering! Please verify your email address to complete your registration.</p>
+                <p style="text-align: center;">
+                    <a href="$verification_link" class="button">Verify Email Address</a>
+                </p>
+                <p>Or copy and paste this link into your browser:</p>
+                <div class="token">$verification_link</div>
+                <p><strong>⏰ This link will expire in 24 hours.</strong></p>
+                <p>If you didn't create an account with ConnectBest Chat, please ignore this email.</p>
+            </div>
+            <div class="footer">
+                <p>© 2025 ConnectBest Chat. All rights reserved.</p>
+            </div>
+        </body>
+        </html>
+        """)
+
+_PASSWORD_RESET_HTML = Template(_HTML_HEAD + """
+        <body>
+            <div class="header">
+                <h1>Password Reset Request 🔐</h1>
+            </div>
+            <div class="content">
+                <p>Hi <strong>$name</strong>,</p>
+                <p>We received a request to reset your password. Click the button below to create a new password:</p>
+                <p style="text-align: center;">
+                    <a href="$reset_link" class="button">Reset Password</a>
+                </p>
+                <p><strong>⏰ This link will expire in 1 hour.</strong></p>
+                <p>If you didn't request a password reset, please ignore this email or contact support if you have concerns.</p>
+            </div>
+            <div class="footer">
+                <p>© 2025 ConnectBest Chat. All rights reserved.</p>
+            </div>
+        </body>
+        </html>
+        """)
+
+_WELCOME_HTML = Template(_HTML_HEAD + """
+        <body>
+            <div class="header">
+                <h1>You're All Set! 🚀</h1>
+            </div>
+            <div class="content">
+                <p>Hi <strong>$name</strong>,</p>
+                <p>Your email has been verified successfully! You can now enjoy all features of ConnectBest Chat:</p>
+                <ul>
+                    <li>💬 Real-time messaging</li>
+                    <li>👥 Team channels</li>
+                    <li>📎 File sharing</li>
+                    <li>🎥 Video calls</li>
+                    <li>🔔 Notifications</li>
+                </ul>
+                <p style="text-align: center;">
+                    <a href="$frontend_url/login" class="button">Start Chatting</a>
+                </p>
+                <p>Need help getting started? Check out our guide or contact support.</p>
+            </div>
+            <div class="footer">
+                <p>© 2025 ConnectBest Chat. All rights reserved.</p>
+            </div>
+        </body>
+        </html>
+        """)
+
 
 class EmailService:
     """Email service for sending various types of emails"""
@@ -22,6 +165,9 @@ class EmailService:
         """Initialize email service with SMTP configuration"""
         self.smtp_host = os.getenv('SMTP_HOST', 'smtp.gmail.com')
         self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
+        # Seconds to wait on the SMTP server before giving up, so a stalled
+        # mail server can't hold a request (and its green thread) forever
+        self.smtp_timeout = float(os.getenv('SMTP_TIMEOUT', '20'))
         self.smtp_user = os.getenv('SMTP_USER', '')
         self.smtp_password = os.getenv('SMTP_PASSWORD', '')
         self.smtp_from_email = os.getenv('SMTP_FROM_EMAIL', self.smtp_user)
@@ -45,40 +191,54 @@ class EmailService:
             bool: True if email sent successfully, False otherwise
         """
         if not self.is_configured:
-            print("⚠️  Email service not configured. Set SMTP_USER and SMTP_PASSWORD in .env")
-            print(f"📧 Would have sent email to {to_email}")
-            print(f"   Subject: {subject}")
+            logger.warning("Email service not configured. Set SMTP_USER and SMTP_PASSWORD in .env")
+            logger.info("Would have sent email to %s (subject: %s)", to_email, subject)
             return False
         
         try:
             # Create message
-            message = MIMEMultipart('alternative')
-            message['From'] = f"{self.smtp_from_name} <{self.smtp_from_email}>"
+            message = self._build_message(subject, html_body, text_body)
             message['To'] = to_email
-            message['Subject'] = subject
-            
-            # Add plain text version
-            if text_body:
-                text_part = MIMEText(text_body, 'plain')
-                message.attach(text_part)
-            
-            # Add HTML version
-            html_part = MIMEText(html_body, 'html')
-            message.attach(html_part)
             
-            # Connect to SMTP server and send
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
+            # A connection per email: the module-level service is created
+            # before eventlet patches threading under gunicorn --preload, so
+            # sharing one connection behind a lock would block the worker
+            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.smtp_timeout) as server:
                 server.starttls()
                 server.login(self.smtp_user, self.smtp_password)
                 server.send_message(message)
             
-            print(f"✅ Email sent successfully to {to_email}")
+            logger.info("Email sent successfully to %s", to_email)
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {str(e)}")
+            logger.error("Failed to send email to %s: %s", to_email, e, exc_info=True)
             return False
     
+    def _build_message(self, subject: str, html_body: str, text_body: Optional[str] = None) -> MIMEMultipart:
+        """
+        Build the recipient-independent part of an email (no To header).
+        
+        Args:
+            subject: Email subject
+            html_body: HTML version of email body
+            text_body: Plain text version of email body (optional)
+        
+        Returns:
+            MIMEMultipart: Message ready for a To header
+        """
+        message = MIMEMultipart('alternative')
+        message['From'] = f"{self.smtp_from_name} <{self.smtp_from_email}>"
+        message['Subject'] = subject
+        
+        # Add plain text version
+        if text_body:
+            message.attach(MIMEText(text_body, 'plain'))
+        
+        # Add HTML version
+        message.attach(MIMEText(html_body, 'html'))
+        return message
+    
     def send_verification_email(self, to_email: str, name: str, verification_token: str) -> bool:
         """
         Send email verification link to user
@@ -96,78 +256,7 @@ class EmailService:
         subject = "Verify Your Email - ConnectBest Chat"
         
         # HTML email template
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 30px;
-                    text-align: center;
-                    border-radius: 10px 10px 0 0;
-                }}
-                .content {{
-                    background: #f9f9f9;
-                    padding: 30px;
-                    border-radius: 0 0 10px 10px;
-                }}
-                .button {{
-                    display: inline-block;
-                    padding: 15px 30px;
-                    background: #667eea;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    margin: 20px 0;
-                    font-weight: bold;
-                }}
-                .footer {{
-                    text-align: center;
-                    margin-top: 30px;
-                    color: #666;
-                    font-size: 12px;
-                }}
-                .token {{
-                    background: #e0e0e0;
-                    padding: 10px;
-                    border-radius: 5px;
-                    font-family: monospace;
-                    word-break: break-all;
-                    margin: 10px 0;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Welcome to ConnectBest Chat! 🎉</h1>
-            </div>
-            <div class="content">
-                <p>Hi <strong>{name}</strong>,</p>
-                <p>Thank you for registering! Please verify your email address to complete your registration.</p>
-                <p style="text-align: center;">
-                    <a href="{verification_link}" class="button">Verify Email Address</a>
-                </p>
-                <p>Or copy and paste this link into your browser:</p>
-                <div class="token">{verification_link}</div>
-                <p><strong>⏰ This link will expire in 24 hours.</strong></p>
-                <p>If you didn't create an account with ConnectBest Chat, please ignore this email.</p>
-            </div>
-            <div class="footer">
-                <p>© 2025 ConnectBest Chat. All rights reserved.</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_body = _VERIFICATION_HTML.substitute(name=name, verification_link=verification_link)
         
         # Plain text version
         text_body = f"""
@@ -204,68 +293,7 @@ class EmailService:
         
         subject = "Reset Your Password - ConnectBest Chat"
         
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 30px;
-                    text-align: center;
-                    border-radius: 10px 10px 0 0;
-                }}
-                .content {{
-                    background: #f9f9f9;
-                    padding: 30px;
-                    border-radius: 0 0 10px 10px;
-                }}
-                .button {{
-                    display: inline-block;
-                    padding: 15px 30px;
-                    background: #667eea;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    margin: 20px 0;
-                    font-weight: bold;
-                }}
-                .footer {{
-                    text-align: center;
-                    margin-top: 30px;
-                    color: #666;
-                    font-size: 12px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Password Reset Request 🔐</h1>
-            </div>
-            <div class="content">
-                <p>Hi <strong>{name}</strong>,</p>
-                <p>We received a request to reset your password. Click the button below to create a new password:</p>
-                <p style="text-align: center;">
-                    <a href="{reset_link}" class="button">Reset Password</a>
-                </p>
-                <p><strong>⏰ This link will expire in 1 hour.</strong></p>
-                <p>If you didn't request a password reset, please ignore this email or contact support if you have concerns.</p>
-            </div>
-            <div class="footer">
-                <p>© 2025 ConnectBest Chat. All rights reserved.</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_body = _PASSWORD_RESET_HTML.substitute(name=name, reset_link=reset_link)
         
         text_body = f"""
         Password Reset Request
@@ -298,74 +326,7 @@ class EmailService:
         """
         subject = "Welcome to ConnectBest Chat! 🎉"
         
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 30px;
-                    text-align: center;
-                    border-radius: 10px 10px 0 0;
-                }}
-                .content {{
-                    background: #f9f9f9;
-                    padding: 30px;
-                    border-radius: 0 0 10px 10px;
-                }}
-                .button {{
-                    display: inline-block;
-                    padding: 15px 30px;
-                    background: #667eea;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    margin: 20px 0;
-                    font-weight: bold;
-                }}
-                .footer {{
-                    text-align: center;
-                    margin-top: 30px;
-                    color: #666;
-                    font-size: 12px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>You're All Set! 🚀</h1>
-            </div>
-            <div class="content">
-                <p>Hi <strong>{name}</strong>,</p>
-                <p>Your email has been verified successfully! You can now enjoy all features of ConnectBest Chat:</p>
-                <ul>
-                    <li>💬 Real-time messaging</li>
-                    <li>👥 Team channels</li>
-                    <li>📎 File sharing</li>
-                    <li>🎥 Video calls</li>
-                    <li>🔔 Notifications</li>
-                </ul>
-                <p style="text-align: center;">
-                    <a href="{self.frontend_url}/login" class="button">Start Chatting</a>
-                </p>
-                <p>Need help getting started? Check out our guide or contact support.</p>
-            </div>
-            <div class="footer">
-                <p>© 2025 ConnectBest Chat. All rights reserved.</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_body = _WELCOME_HTML.substitute(name=name, frontend_url=self.frontend_url)
         
         text_body = f"""
         You're All Set!
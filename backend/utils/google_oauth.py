@@ -5,11 +5,28 @@ This module handles Google OAuth 2.0 authentication flow.
 Provides functions for generating authorization URLs and validating tokens.
 """
 
+import logging
 import os
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Optional
 from urllib.parse import urlencode
 
+logger = logging.getLogger(__name__)
+
+
+# Shared HTTP session: keeps TLS connections to Google alive across calls
+# instead of doing a fresh handshake per request.
+_http_session = requests.Session()
+# Each Google host gets its own pool; with concurrent sign-ins sharing one
+# worker, the default 10 keep-alive slots per host get churned.
+_http_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+# (connect, read) seconds - fail fast when Google is unreachable, but give
+# token exchanges the full read window
+GOOGLE_HTTP_TIMEOUT = (5, 10)
+
 
 class GoogleOAuth:
     """Google OAuth 2.0 helper class"""
@@ -77,11 +94,11 @@ class GoogleOAuth:
         }
         
         try:
-            response = requests.post(self.token_url, data=data, timeout=10)
+            response = _http_session.post(self.token_url, data=data, timeout=GOOGLE_HTTP_TIMEOUT)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error exchanging code for token: {e}")
+            return orjson.loads(response.content)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Error exchanging code for token: %s", e)
             return None
     
     def get_user_info(self, access_token: str) -> Optional[Dict]:
@@ -100,11 +117,11 @@ class GoogleOAuth:
         }
         
         try:
-            response = requests.get(self.userinfo_url, headers=headers, timeout=10)
+            response = _http_session.get(self.userinfo_url, headers=headers, timeout=GOOGLE_HTTP_TIMEOUT)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error getting user info: {e}")
+            return orjson.loads(response.content)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Error getting user info: %s", e)
             return None
     
     def verify_id_token(self, id_token: str) -> Optional[Dict]:
@@ -121,19 +138,19 @@ class GoogleOAuth:
         try:
             # Use Google's tokeninfo endpoint for verification
             url = f'https://oauth2.googleapis.com/tokeninfo?id_token={id_token}'
-            response = requests.get(url, timeout=10)
+            response = _http_session.get(url, timeout=GOOGLE_HTTP_TIMEOUT)
             response.raise_for_status()
             
-            token_info = response.json()
+            token_info = orjson.loads(response.content)
             
             # Verify audience matches our client ID
             if token_info.get('aud') != self.client_id:
-                print("Invalid audience in ID token")
+                logger.warning("Invalid audience in ID token")
                 return None
             
             return token_info
-        except requests.exceptions.RequestException as e:
-            print(f"Error verifying ID token: {e}")
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.error("Error verifying ID token: %s", e)
             return None
 
 
@@ -165,8 +182,8 @@ def create_google_oauth_instance() -> Optional[GoogleOAuth]:
         None: If credentials not configured
     """
     if not validate_google_credentials():
-        print("⚠️  Google OAuth credentials not configured")
-        print("Set GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET in .env file")
+        logger.warning("Google OAuth credentials not configured. "
+                       "Set GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET in .env file")
         return None
     
     return GoogleOAuth()
@@ -0,0 +1,33 @@
+"""
+Green Thread Pool Helpers
+
+Runs independent I/O calls side by side on a bounded eventlet GreenPool
+with the Flask app context available, so callers can use current_app.
+Green threads rather than OS threads: the server runs on eventlet, so the
+calls already yield on network I/O and waiting on them never blocks the hub.
+"""
+
+from eventlet.greenpool import GreenPool
+from eventlet.greenthread import GreenThread
+from flask import current_app
+
+
+def submit_in_app_context(pool: GreenPool, fn, *args, **kwargs) -> GreenThread:
+    """
+    Run fn on the given pool with the current Flask app context pushed.
+
+    Args:
+        pool: GreenPool that bounds how many of these calls run at once
+        fn: Callable to run (may use current_app)
+        *args, **kwargs: Passed through to fn
+
+    Returns:
+        GreenThread: wait() returns fn's result (or re-raises its exception)
+    """
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            return fn(*args, **kwargs)
+
+    return pool.spawn(run)
@@ -14,6 +14,27 @@ import re
 from typing import Tuple
 
 
+# Patterns are compiled once at import time instead of on every call.
+#
+# Email regex pattern
+# Explanation:
+# ^[a-zA-Z0-9._%+-]{1,64} : Username part (letters, numbers, special chars)
+# @ : Must have @ symbol
+# [a-zA-Z0-9.-]{1,252} : Domain name
+# \. : Must have dot
+# [a-zA-Z]{2,63}$ : Domain extension (at least 2 letters)
+# Quantifiers are capped at the RFC 5321 part lengths so a long hostile
+# input can't make the overlapping classes backtrack for long.
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]{1,252}\.[a-zA-Z]{2,63}$')
+# One alternation for the password character classes: the password is
+# scanned once, and the named group that matched tells us which class a
+# character belongs to.
+PASSWORD_CHAR_CLASS_PATTERN = re.compile(r'(?P<lower>[a-z])|(?P<upper>[A-Z])|(?P<digit>[0-9])')
+NAME_PATTERN = re.compile(r"^[a-zA-Z\s\-']+$")
+CHANNEL_NAME_PATTERN = re.compile(r'^[a-z][a-z0-9\-]*$')
+PHONE_FORMATTING_PATTERN = re.compile(r'[\s\-\(\)\+]')
+
+
 def validate_email(email: str) -> Tuple[bool, str]:
     """
     Validate email address format.
@@ -21,6 +42,7 @@ def validate_email(email: str) -> Tuple[bool, str]:
     LEARNING NOTE:
     - Uses regex pattern to check email format
     - Pattern checks: username@domain.tld
+    - Length and '@' count are checked before the regex runs
     - Returns tuple: (is_valid, error_message)
     
     Args:
@@ -33,21 +55,14 @@ def validate_email(email: str) -> Tuple[bool, str]:
     if not email or not isinstance(email, str):
         return False, "Email is required"
     
-    # Email regex pattern
-    # Explanation:
-    # ^[a-zA-Z0-9._%+-]+ : Username part (letters, numbers, special chars)
-    # @ : Must have @ symbol
-    # [a-zA-Z0-9.-]+ : Domain name
-    # \. : Must have dot
-    # [a-zA-Z]{2,}$ : Domain extension (at least 2 letters)
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    
-    if not re.match(email_pattern, email):
-        return False, "Invalid email format"
-    
+    # Cheap structural checks first, so the regex only ever sees short
+    # strings with a single '@'
     if len(email) > 254:  # Email max length per RFC 5321
         return False, "Email is too long"
     
+    if email.count('@') != 1 or not EMAIL_PATTERN.match(email):
+        return False, "Invalid email format"
+    
     return True, ""
 
 
@@ -77,13 +92,20 @@ def validate_password(password: str) -> Tuple[bool, str]:
     if len(password) > 128:
         return False, "Password is too long (max 128 characters)"
     
-    if not re.search(r'[a-z]', password):
+    # Single pass over the password, stopping as soon as every class is seen
+    seen = set()
+    for match in PASSWORD_CHAR_CLASS_PATTERN.finditer(password):
+        seen.add(match.lastgroup)
+        if len(seen) == 3:
+            break
+    
+    if 'lower' not in seen:
         return False, "Password must contain at least one lowercase letter"
     
-    if not re.search(r'[A-Z]', password):
+    if 'upper' not in seen:
         return False, "Password must contain at least one uppercase letter"
     
-    if not re.search(r'[0-9]', password):
+    if 'digit' not in seen:
         return False, "Password must contain at least one number"
     
     return True, ""
@@ -112,7 +134,7 @@ def validate_name(name: str) -> Tuple[bool, str]:
         return False, "Name is too long (max 100 characters)"
     
     # Check for valid characters (letters, spaces, hyphens, apostrophes)
-    if not re.match(r"^[a-zA-Z\s\-']+$", name):
+    if not NAME_PATTERN.match(name):
         return False, "Name contains invalid characters"
     
     return True, ""
@@ -146,7 +168,7 @@ def validate_channel_name(name: str) -> Tuple[bool, str]:
         return False, "Channel name is too long (max 50 characters)"
     
     # Must start with letter, contain only letters, numbers, hyphens
-    if not re.match(r'^[a-z][a-z0-9\-]*$', name):
+    if not CHANNEL_NAME_PATTERN.match(name):
         return False, "Channel name must start with a letter and contain only lowercase letters, numbers, and hyphens"
     
     return True, ""
@@ -195,7 +217,7 @@ def validate_phone(phone: str) -> Tuple[bool, str]:
         return False, "Invalid phone format"
     
     # Remove common formatting characters
-    cleaned = re.sub(r'[\s\-\(\)\+]', '', phone)
+    cleaned = PHONE_FORMATTING_PATTERN.sub('', phone)
     
     # Check if contains only digits
     if not cleaned.isdigit():